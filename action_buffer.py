@@ -0,0 +1,208 @@
+"""
+Compact columnar storage for recorded actions
+"""
+import threading
+from array import array
+from collections.abc import Sequence
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+import keymap
+
+ACTION_TYPES = ('mouse_move', 'mouse_press', 'mouse_release', 'mouse_scroll', 'key_press', 'key_release')
+TYPE_CODES = {name: code for code, name in enumerate(ACTION_TYPES)}
+
+MOUSE_MOVE, MOUSE_PRESS, MOUSE_RELEASE, MOUSE_SCROLL, KEY_PRESS, KEY_RELEASE = range(len(ACTION_TYPES))
+
+BUTTONS = ('', 'left', 'right', 'middle')
+BUTTON_CODES = {name: code for code, name in enumerate(BUTTONS)}
+
+# The keys column holds keymap ids. A name keymap has no id for is kept in the buffer's
+# key_names and stored as -2 - its index there, which leaves -1 for rows without a key.
+NO_KEY = -1
+
+
+def key_name(key: int, key_names: List[str]) -> str:
+    if key >= 0:
+        return keymap.key_name(key)
+    if key == NO_KEY:
+        return ''
+    return key_names[-2 - key]
+
+
+def build_action(type_code: int, x: int, y: int, button: int, dx: int, dy: int,
+                 key_name: str, timestamp: float) -> Dict[str, Any]:
+    # Rebuild the dict exactly as the recorder used to create it
+    if type_code == MOUSE_MOVE:
+        return {
+            'type': 'mouse_move',
+            'x': x,
+            'y': y,
+            'timestamp': timestamp
+        }
+    
+    if type_code == MOUSE_PRESS or type_code == MOUSE_RELEASE:
+        return {
+            'type': ACTION_TYPES[type_code],
+            'x': x,
+            'y': y,
+            'button': BUTTONS[button],
+            'timestamp': timestamp
+        }
+    
+    if type_code == MOUSE_SCROLL:
+        return {
+            'type': 'mouse_scroll',
+            'x': x,
+            'y': y,
+            'dx': dx,
+            'dy': dy,
+            'timestamp': timestamp
+        }
+    
+    return {
+        'type': ACTION_TYPES[type_code],
+        'key': key_name,
+        'timestamp': timestamp
+    }
+
+
+# One typed array per action field: ~30 bytes per event instead of a
+# several-hundred-byte dict. Dicts are only built on demand via ActionView.
+class ActionBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.types = array('B')
+        self.xs = array('i')
+        self.ys = array('i')
+        self.buttons = array('B')
+        self.dxs = array('i')
+        self.dys = array('i')
+        self.keys = array('i')
+        self.timestamps = array('d')
+        self.key_names: List[str] = []
+        self._key_ids: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        # timestamps is appended last, so every row counted here is complete even
+        # while another thread is in the middle of append()
+        return len(self.timestamps)
+    
+    def key_id(self, key_name: str) -> int:
+        key = keymap.key_id(key_name)
+        if key is not None:
+            return key
+        key = self._key_ids.get(key_name)
+        if key is None:
+            key = -2 - len(self.key_names)
+            self.key_names.append(key_name)
+            self._key_ids[key_name] = key
+        return key
+    
+    def key_name(self, key: int) -> str:
+        return key_name(key, self.key_names)
+    
+    def set_key_names(self, key_names: List[str]):
+        # Restores a saved table, each name at its stored index
+        self.key_names = list(key_names)
+        self._key_ids = {name: -2 - i for i, name in enumerate(self.key_names)}
+    
+    def append(self, type_code: int, x: int = 0, y: int = 0, button: int = 0,
+               dx: int = 0, dy: int = 0, key: int = NO_KEY, timestamp: float = 0.0):
+        # Mouse and keyboard listeners run on separate threads; keep rows aligned
+        with self._lock:
+            self.types.append(type_code)
+            self.xs.append(int(x))
+            self.ys.append(int(y))
+            self.buttons.append(button)
+            self.dxs.append(int(dx))
+            self.dys.append(int(dy))
+            self.keys.append(key)
+            self.timestamps.append(timestamp)
+    
+    def append_key(self, type_code: int, key_name: str, timestamp: float):
+        with self._lock:
+            key = self.key_id(key_name)
+        self.append(type_code, key=key, timestamp=timestamp)
+    
+    def append_action(self, action: Dict[str, Any]) -> bool:
+        type_code = TYPE_CODES.get(action.get('type', ''))
+        if type_code is None:
+            return False
+        
+        if type_code in (KEY_PRESS, KEY_RELEASE):
+            self.append_key(type_code, action.get('key', ''), action.get('timestamp', 0))
+        else:
+            self.append(
+                type_code,
+                action.get('x', 0),
+                action.get('y', 0),
+                BUTTON_CODES.get(action.get('button', ''), 0),
+                action.get('dx', 0),
+                action.get('dy', 0),
+                NO_KEY,
+                action.get('timestamp', 0)
+            )
+        return True
+    
+    def extend(self, actions: Iterable[Dict[str, Any]]):
+        for action in actions:
+            self.append_action(action)
+    
+    @classmethod
+    def from_actions(cls, actions: Iterable[Dict[str, Any]]) -> 'ActionBuffer':
+        if isinstance(actions, ActionView) and len(actions) == len(actions.buffer):
+            return actions.buffer
+        buffer = cls()
+        buffer.extend(actions)
+        return buffer
+    
+    def action(self, index: int) -> Dict[str, Any]:
+        return build_action(
+            self.types[index],
+            self.xs[index],
+            self.ys[index],
+            self.buttons[index],
+            self.dxs[index],
+            self.dys[index],
+            key_name(self.keys[index], self.key_names),
+            self.timestamps[index]
+        )
+    
+    def view(self) -> 'ActionView':
+        return ActionView(self, len(self))
+    
+    def memory_usage(self) -> int:
+        columns = (self.types, self.xs, self.ys, self.buttons, self.dxs, self.dys, self.keys, self.timestamps)
+        return sum(column.itemsize * column.buffer_info()[1] for column in columns)
+
+
+# Read-only list-of-dicts view over the first `length` rows of a buffer.
+# The length is fixed at creation, so rows appended later are not visible.
+class ActionView(Sequence):
+    def __init__(self, buffer: ActionBuffer, length: Optional[int] = None):
+        self.buffer = buffer
+        self._length = len(buffer) if length is None else length
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.buffer.action(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("action index out of range")
+        return self.buffer.action(index)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        action = self.buffer.action
+        for i in range(self._length):
+            yield action(i)
+    
+    def copy(self) -> 'ActionView':
+        # Rows are never mutated in place, so a view is its own copy
+        return ActionView(self.buffer, self._length)
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self) 
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Compile action dicts into pre-resolved playback records
+"""
+from itertools import islice
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from action_buffer import ActionView, BUTTONS, MOUSE_MOVE, MOUSE_PRESS, MOUSE_RELEASE, MOUSE_SCROLL, KEY_PRESS
+from backends import InputBackend
+from playback_source import SequenceSource
+
+
+# (bound backend method, args, offset in recorded seconds from the first action, skippable when late)
+Record = Tuple[Callable[..., Any], Tuple[Any, ...], float, bool]
+
+# A record tuple costs ~270 bytes against ~30 for a row of ActionBuffer columns, so only short
+# sequences, the ones worth looping, are compiled ahead; longer ones compile on the fly
+COMPILE_LIMIT = 20000
+
+
+class ActionCompiler:
+    def __init__(self, backend: InputBackend):
+        self.backend = backend
+        self._keys: Dict[int, Any] = {}
+        self._names: Dict[str, Any] = {}
+        self.first_timestamp: Optional[float] = None
+    
+    def _key(self, key: int):
+        # Each distinct keymap id is resolved once per compile; names without one never play
+        try:
+            return self._keys[key]
+        except KeyError:
+            resolved = self.backend.resolve_key_id(key) if key >= 0 else None
+            self._keys[key] = resolved
+            return resolved
+    
+    def _key_name(self, key_str: str):
+        try:
+            return self._names[key_str]
+        except KeyError:
+            resolved = self.backend.resolve_key(key_str)
+            self._names[key_str] = resolved
+            return resolved
+    
+    def compile_row(self, type_code: int, x: int, y: int, button: int, dx: int, dy: int,
+                    key: int, timestamp: float) -> Optional[Record]:
+        # Same records as compile(), straight from ActionBuffer columns
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        offset = timestamp - self.first_timestamp
+        
+        backend = self.backend
+        if type_code == MOUSE_MOVE:
+            return (backend.move_to, (x, y), offset, True)
+        if type_code == MOUSE_PRESS:
+            return (backend.mouse_down, (x, y, BUTTONS[button]), offset, False)
+        if type_code == MOUSE_RELEASE:
+            return (backend.mouse_up, (x, y, BUTTONS[button]), offset, False)
+        if type_code == MOUSE_SCROLL:
+            return (backend.scroll, (x, y, dx, dy), offset, False)
+        
+        resolved = self._key(key)
+        if resolved is None:
+            return None
+        method = backend.press_key if type_code == KEY_PRESS else backend.release_key
+        return (method, (resolved,), offset, False)
+    
+    def compile(self, action: Dict[str, Any]) -> Optional[Record]:
+        timestamp = action.get('timestamp', 0)
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        offset = timestamp - self.first_timestamp
+        
+        backend = self.backend
+        action_type = action.get('type', '')
+        
+        if action_type == 'mouse_move':
+            return (backend.move_to, (action.get('x', 0), action.get('y', 0)), offset, True)
+        
+        if action_type == 'mouse_press':
+            return (backend.mouse_down, (action.get('x', 0), action.get('y', 0), action.get('button', 'left')), offset, False)
+        
+        if action_type == 'mouse_release':
+            return (backend.mouse_up, (action.get('x', 0), action.get('y', 0), action.get('button', 'left')), offset, False)
+        
+        if action_type == 'mouse_scroll':
+            args = (action.get('x', 0), action.get('y', 0), action.get('dx', 0), action.get('dy', 0))
+            return (backend.scroll, args, offset, False)
+        
+        if action_type == 'key_press' or action_type == 'key_release':
+            key = self._key_name(action.get('key', ''))
+            if key is None:
+                return None
+            method = backend.press_key if action_type == 'key_press' else backend.release_key
+            return (method, (key,), offset, False)
+        
+        return None
+
+
+def iter_records(actions: Iterable[Dict[str, Any]], backend: InputBackend) -> Iterator[Optional[Record]]:
+    # Streaming form: one record (or None for a no-op) per source action
+    compiler = ActionCompiler(backend)
+    if isinstance(actions, SequenceSource):
+        actions = actions.sequence
+    if isinstance(actions, ActionView):
+        # Recordings and binary loads: read the columns, no action dicts or key names
+        buffer = actions.buffer
+        compile_row = compiler.compile_row
+        columns = (buffer.types, buffer.xs, buffer.ys, buffer.buttons, buffer.dxs, buffer.dys,
+                   buffer.keys, buffer.timestamps)
+        count = len(actions)
+        for row in zip(*(islice(column, count) for column in columns)):
+            yield compile_row(*row)
+        return
+    for action in actions:
+        yield compiler.compile(action)
+
+
+def compile_sequence(actions: Iterable[Dict[str, Any]], backend: InputBackend) -> Tuple[Record, ...]:
+    return tuple(record for record in iter_records(actions, backend) if record is not None) 
\ No newline at end of file
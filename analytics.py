@@ -0,0 +1,219 @@
+"""
+Sequence analytics: event rate, mouse path, click heatmap, gaps, idle time and playback cost
+"""
+import math
+from bisect import bisect_right
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from action_buffer import ActionBuffer, ActionView, MOUSE_PRESS, MOUSE_SCROLL, ACTION_TYPES
+from playback_source import SequenceSource
+
+try:
+    # Optional: the same results without numpy, just slower on million-event macros
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Upper edges (seconds) of the inter-event gap histogram; the last bucket is open-ended
+GAP_EDGES = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0)
+DEFAULT_SPEEDS = (0.5, 1.0, 2.0, 5.0, 10.0, 15.0)
+# Rough cost of one injected event with pyautogui and PAUSE = 0; the measured
+# 'player.action' mean from metrics gives a better estimate for the machine at hand
+DEFAULT_ACTION_COST = 0.0005
+MAX_IDLE_SEGMENTS = 100
+# Part of the catalog cache key: bump when a report field changes meaning
+REPORT_VERSION = 2
+
+
+def _columns(sequence) -> Tuple[ActionBuffer, int]:
+    # Recordings and binary loads are already columnar and are used in place
+    if isinstance(sequence, SequenceSource):
+        sequence = sequence.sequence
+    if isinstance(sequence, ActionView):
+        return sequence.buffer, len(sequence)
+    buffer = ActionBuffer.from_actions(sequence)
+    return buffer, len(buffer)
+
+
+def _gap_labels() -> List[str]:
+    labels = []
+    lower = 0.0
+    for edge in GAP_EDGES:
+        labels.append(f"{lower * 1000:g}-{edge * 1000:g} ms")
+        lower = edge
+    labels.append(f">{lower * 1000:g} ms")
+    return labels
+
+
+def _kernels_numpy(buffer: ActionBuffer, n: int, rate_buckets: int, heatmap_size: Tuple[int, int],
+                   idle_threshold: float, speeds: Iterable[float], action_cost: float) -> Dict[str, Any]:
+    # Zero-copy views of the buffer's typed arrays
+    ts = np.frombuffer(buffer.timestamps, dtype=np.float64, count=n)
+    types = np.frombuffer(buffer.types, dtype=np.uint8, count=n)
+    xs = np.frombuffer(buffer.xs, dtype=np.intc, count=n)
+    ys = np.frombuffer(buffer.ys, dtype=np.intc, count=n)
+    start, end = float(ts[0]), float(ts[-1])
+    
+    width = max(end - start, 1e-9) / rate_buckets
+    rate = np.bincount(np.minimum(((ts - start) / width).astype(np.int64), rate_buckets - 1),
+                       minlength=rate_buckets)
+    
+    mouse = types <= MOUSE_SCROLL
+    mx = xs[mouse].astype(np.float64)
+    my = ys[mouse].astype(np.float64)
+    path_length = float(np.hypot(np.diff(mx), np.diff(my)).sum()) if len(mx) > 1 else 0.0
+    bounds = (int(mx.min()), int(my.min()), int(mx.max()), int(my.max())) if len(mx) else (0, 0, 0, 0)
+    
+    cols, rows = heatmap_size
+    presses = types == MOUSE_PRESS
+    px, py = xs[presses].astype(np.int64), ys[presses].astype(np.int64)
+    col = np.minimum((px - bounds[0]) * cols // max(1, bounds[2] - bounds[0] + 1), cols - 1)
+    row = np.minimum((py - bounds[1]) * rows // max(1, bounds[3] - bounds[1] + 1), rows - 1)
+    heatmap = np.bincount(row * cols + col, minlength=rows * cols).reshape(rows, cols)
+    
+    gaps = np.diff(ts)
+    gap_counts = np.bincount(np.searchsorted(GAP_EDGES, gaps, side='right'), minlength=len(GAP_EDGES) + 1)
+    idle = gaps > idle_threshold
+    idle_starts, idle_ends = ts[:-1][idle], ts[1:][idle]
+    
+    # Playback wall time: action i ends at (i + 1) * cost + max over j <= i of (deadline_j - j * cost),
+    # i.e. a running maximum, which also gives how far behind schedule the player falls
+    steps = np.arange(n) * action_cost
+    cost = {}
+    for speed in speeds:
+        deadlines = (ts - start) / speed
+        finish = steps + action_cost + np.maximum.accumulate(deadlines - steps)
+        cost[speed] = (float(finish[-1]), float((finish - action_cost - deadlines).max()))
+    
+    return {
+        'types': np.bincount(types, minlength=len(ACTION_TYPES)).tolist(),
+        'rate': rate.tolist(),
+        'rate_width': width,
+        'path_length': path_length,
+        'bounds': bounds,
+        'heatmap': heatmap.tolist(),
+        'clicks': int(presses.sum()),
+        'gaps': gap_counts.tolist(),
+        'idle': list(zip(idle_starts.tolist(), idle_ends.tolist())),
+        'idle_time': float((idle_ends - idle_starts - idle_threshold).sum()),
+        'cost': cost
+    }
+
+
+def _kernels_python(buffer: ActionBuffer, n: int, rate_buckets: int, heatmap_size: Tuple[int, int],
+                    idle_threshold: float, speeds: Iterable[float], action_cost: float) -> Dict[str, Any]:
+    ts = buffer.timestamps[:n] if n < len(buffer) else buffer.timestamps
+    types, xs, ys = buffer.types, buffer.xs, buffer.ys
+    start, end = ts[0], ts[-1]
+    
+    width = max(end - start, 1e-9) / rate_buckets
+    rate = [0] * rate_buckets
+    for timestamp in ts:
+        rate[min(int((timestamp - start) / width), rate_buckets - 1)] += 1
+    
+    type_counts = [0] * len(ACTION_TYPES)
+    path_length = 0.0
+    left = top = right = bottom = None
+    previous = None
+    presses = []
+    for i in range(n):
+        type_code = types[i]
+        type_counts[type_code] += 1
+        if type_code > MOUSE_SCROLL:
+            continue
+        x, y = xs[i], ys[i]
+        if previous is not None:
+            path_length += math.hypot(x - previous[0], y - previous[1])
+        else:
+            left, top, right, bottom = x, y, x, y
+        previous = (x, y)
+        left, top, right, bottom = min(left, x), min(top, y), max(right, x), max(bottom, y)
+        if type_code == MOUSE_PRESS:
+            presses.append(previous)
+    bounds = (left, top, right, bottom) if previous is not None else (0, 0, 0, 0)
+    
+    cols, rows = heatmap_size
+    heatmap = [[0] * cols for _ in range(rows)]
+    for x, y in presses:
+        col = min((x - bounds[0]) * cols // max(1, bounds[2] - bounds[0] + 1), cols - 1)
+        row = min((y - bounds[1]) * rows // max(1, bounds[3] - bounds[1] + 1), rows - 1)
+        heatmap[row][col] += 1
+    
+    gap_counts = [0] * (len(GAP_EDGES) + 1)
+    idle = []
+    idle_time = 0.0
+    for i in range(1, n):
+        gap = ts[i] - ts[i - 1]
+        gap_counts[bisect_right(GAP_EDGES, gap)] += 1
+        if gap > idle_threshold:
+            idle.append((ts[i - 1], ts[i]))
+            idle_time += gap - idle_threshold
+    
+    cost = {}
+    for speed in speeds:
+        # Same running-maximum recurrence as the numpy kernel; the lag at i is best - value
+        best = -math.inf
+        lag = 0.0
+        for i, timestamp in enumerate(ts):
+            value = (timestamp - start) / speed - i * action_cost
+            if value > best:
+                best = value
+            elif best - value > lag:
+                lag = best - value
+        cost[speed] = (best + n * action_cost, lag)
+    
+    return {
+        'types': type_counts,
+        'rate': rate,
+        'rate_width': width,
+        'path_length': path_length,
+        'bounds': bounds,
+        'heatmap': heatmap,
+        'clicks': len(presses),
+        'gaps': gap_counts,
+        'idle': idle,
+        'idle_time': idle_time,
+        'cost': cost
+    }
+
+
+def analyze(sequence, idle_threshold: float = 1.0, speeds: Iterable[float] = DEFAULT_SPEEDS,
+            action_cost: float = DEFAULT_ACTION_COST, rate_buckets: int = 60,
+            heatmap_size: Tuple[int, int] = (32, 18), use_numpy: Optional[bool] = None) -> Dict[str, Any]:
+    # JSON-serializable report; every list has a fixed size whatever the macro length,
+    # except idle_segments which keeps the MAX_IDLE_SEGMENTS longest. duration and idle_time
+    # mean the same as everywhere else: the last action's timestamp, and the part of each
+    # gap beyond idle_threshold (see timeline.timing_profile)
+    buffer, n = _columns(sequence)
+    speeds = tuple(speeds)
+    if not n:
+        return {'actions': 0, 'duration': 0.0}
+    
+    if use_numpy is None:
+        use_numpy = np is not None
+    kernels = _kernels_numpy if use_numpy and np is not None else _kernels_python
+    raw = kernels(buffer, n, rate_buckets, heatmap_size, idle_threshold, speeds, action_cost)
+    
+    duration = buffer.timestamps[n - 1]
+    longest = sorted(raw['idle'], key=lambda segment: segment[0] - segment[1])[:MAX_IDLE_SEGMENTS]
+    return {
+        'actions': n,
+        'duration': duration,
+        'events_per_sec': n / duration if duration else 0.0,
+        'types': {name: count for name, count in zip(ACTION_TYPES, raw['types']) if count},
+        'rate': {'bucket_seconds': raw['rate_width'], 'counts': raw['rate'], 'peak_per_sec': max(raw['rate']) / raw['rate_width']},
+        'path_length': raw['path_length'],
+        'clicks': raw['clicks'],
+        'heatmap': {'bounds': list(raw['bounds']), 'columns': heatmap_size[0], 'rows': heatmap_size[1], 'counts': raw['heatmap']},
+        'gaps': {'labels': _gap_labels(), 'counts': raw['gaps']},
+        'idle_threshold': idle_threshold,
+        'idle_segments': [{'start': s, 'end': e} for s, e in sorted(longest)],
+        'idle_count': len(raw['idle']),
+        'idle_time': raw['idle_time'],
+        'action_cost': action_cost,
+        'playback_cost': [
+            {'speed': speed, 'seconds': raw['cost'][speed][0], 'max_lag': raw['cost'][speed][1]}
+            for speed in speeds
+        ]
+    } 
\ No newline at end of file
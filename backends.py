@@ -0,0 +1,224 @@
+"""
+Input backends used by MacroPlayer to inject mouse and keyboard events
+"""
+import time
+from typing import List, Tuple, Any
+
+import keymap
+
+
+class FailSafeTriggered(Exception):
+    pass
+
+
+class InputBackend:
+    name = ''
+    # Whether the player should merge mouse moves that are already due into one (see
+    # PlaybackScheduler.coalesce_moves)
+    coalesce_moves = False
+    
+    def move_to(self, x: int, y: int):
+        raise NotImplementedError
+    
+    def mouse_down(self, x: int, y: int, button: str):
+        raise NotImplementedError
+    
+    def mouse_up(self, x: int, y: int, button: str):
+        raise NotImplementedError
+    
+    def scroll(self, x: int, y: int, dx: int, dy: int):
+        raise NotImplementedError
+    
+    def resolve_key_id(self, key: int):
+        # Map a keymap id to whatever press_key/release_key expect, or None if unsupported
+        raise NotImplementedError
+    
+    def resolve_key(self, key_str: str):
+        key = keymap.key_id(key_str)
+        return self.resolve_key_id(key) if key is not None else None
+    
+    def press_key(self, key):
+        raise NotImplementedError
+    
+    def release_key(self, key):
+        raise NotImplementedError
+    
+    def key_down(self, key: int):
+        resolved = self.resolve_key_id(key)
+        if resolved is not None:
+            self.press_key(resolved)
+    
+    def key_up(self, key: int):
+        resolved = self.resolve_key_id(key)
+        if resolved is not None:
+            self.release_key(resolved)
+    
+    def close(self):
+        pass
+
+
+class PyAutoGUIBackend(InputBackend):
+    name = 'pyautogui'
+    
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+        
+        # PyAutoGUI safety settings
+        pyautogui.FAILSAFE = True
+        # Timing comes from the scheduler's deadlines; an injected pause would only add lateness
+        pyautogui.PAUSE = 0
+        # Special keys are looked up in KEYBOARD_KEYS once, not probed per event
+        self.special_keys = keymap.pyautogui_table(getattr(pyautogui, 'KEYBOARD_KEYS', ()))
+    
+    def _call(self, func, *args, **kwargs):
+        try:
+            func(*args, **kwargs)
+        except self.pyautogui.FailSafeException as e:
+            raise FailSafeTriggered(str(e))
+    
+    def move_to(self, x: int, y: int):
+        self._call(self.pyautogui.moveTo, x, y)
+    
+    def mouse_down(self, x: int, y: int, button: str):
+        self._call(self.pyautogui.mouseDown, x, y, button=button)
+    
+    def mouse_up(self, x: int, y: int, button: str):
+        self._call(self.pyautogui.mouseUp, x, y, button=button)
+    
+    def scroll(self, x: int, y: int, dx: int, dy: int):
+        self._call(self.pyautogui.scroll, dy, x=x, y=y)
+    
+    def resolve_key_id(self, key: int):
+        if key >= keymap.VK_BASE:
+            return None
+        if key >= keymap.SPECIAL_BASE:
+            return self.special_keys.get(key)
+        return chr(key)
+    
+    def press_key(self, key):
+        self._call(self.pyautogui.keyDown, key)
+    
+    def release_key(self, key):
+        self._call(self.pyautogui.keyUp, key)
+
+
+class PynputBackend(InputBackend):
+    name = 'pynput'
+    coalesce_moves = True
+    
+    # Checking the real cursor position costs a round trip, so the fail-safe is sampled
+    FAILSAFE_INTERVAL = 0.05
+    # Pixels from the top-left corner that count as the corner, since a fast flick rarely lands on (0, 0)
+    FAILSAFE_MARGIN = 5
+    
+    def __init__(self, failsafe: bool = True):
+        from pynput import mouse, keyboard
+        self.Button = mouse.Button
+        self.Key = keyboard.Key
+        self.KeyCode = keyboard.KeyCode
+        self.mouse = mouse.Controller()
+        self.keyboard = keyboard.Controller()
+        self.failsafe = failsafe
+        self._last_check = 0.0
+    
+    def _check_failsafe(self):
+        if not self.failsafe:
+            return
+        now = time.perf_counter()
+        if now - self._last_check < self.FAILSAFE_INTERVAL:
+            return
+        self._last_check = now
+        x, y = self.mouse.position
+        if x <= self.FAILSAFE_MARGIN and y <= self.FAILSAFE_MARGIN:
+            raise FailSafeTriggered("Mouse moved to the top-left corner")
+    
+    def move_to(self, x: int, y: int):
+        self._check_failsafe()
+        self.mouse.position = (x, y)
+    
+    def mouse_down(self, x: int, y: int, button: str):
+        self.move_to(x, y)
+        self.mouse.press(getattr(self.Button, button, self.Button.left))
+    
+    def mouse_up(self, x: int, y: int, button: str):
+        self.move_to(x, y)
+        self.mouse.release(getattr(self.Button, button, self.Button.left))
+    
+    def scroll(self, x: int, y: int, dx: int, dy: int):
+        self.move_to(x, y)
+        self.mouse.scroll(dx, dy)
+    
+    def resolve_key_id(self, key: int):
+        if key >= keymap.VK_BASE:
+            return self.KeyCode.from_vk(key - keymap.VK_BASE)
+        if key >= keymap.SPECIAL_BASE:
+            # Some special keys only exist on some platforms
+            return getattr(self.Key, keymap.special_name(key), None)
+        return self.KeyCode.from_char(chr(key))
+    
+    def press_key(self, key):
+        self._check_failsafe()
+        self.keyboard.press(key)
+    
+    def release_key(self, key):
+        self.keyboard.release(key)
+
+
+class RecordingBackend(InputBackend):
+    # In-memory fake: needs no display, used for tests and benchmarks
+    name = 'fake'
+    
+    def __init__(self, keep_events: bool = True):
+        self.keep_events = keep_events
+        self.events: List[Tuple[Any, ...]] = []
+        self.count = 0
+        self.position = (0, 0)
+    
+    def _record(self, *event):
+        self.count += 1
+        if self.keep_events:
+            self.events.append(event)
+    
+    def move_to(self, x: int, y: int):
+        self.position = (x, y)
+        self._record('move_to', x, y)
+    
+    def mouse_down(self, x: int, y: int, button: str):
+        self.position = (x, y)
+        self._record('mouse_down', x, y, button)
+    
+    def mouse_up(self, x: int, y: int, button: str):
+        self.position = (x, y)
+        self._record('mouse_up', x, y, button)
+    
+    def scroll(self, x: int, y: int, dx: int, dy: int):
+        self.position = (x, y)
+        self._record('scroll', x, y, dx, dy)
+    
+    def resolve_key_id(self, key: int):
+        return keymap.key_name(key)
+    
+    def press_key(self, key):
+        self._record('key_down', key)
+    
+    def release_key(self, key):
+        self._record('key_up', key)
+    
+    def clear(self):
+        self.events.clear()
+        self.count = 0
+
+
+BACKENDS = {
+    PyAutoGUIBackend.name: PyAutoGUIBackend,
+    PynputBackend.name: PynputBackend,
+    RecordingBackend.name: RecordingBackend,
+}
+
+
+def create_backend(name: str = 'pyautogui') -> InputBackend:
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown input backend: {name}")
+    return backend_class() 
\ No newline at end of file
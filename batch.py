@@ -0,0 +1,235 @@
+"""
+Bulk conversion and optimization of a macros directory with a process pool
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterator, Optional
+
+import compressed_io
+from storage import MACRO_EXTENSIONS, MacroStorage
+
+
+STATE_FILE = '.batch_state.jsonl'
+
+
+class BatchSummary:
+    def __init__(self):
+        self.files = 0
+        self.skipped = 0
+        self.failed = 0
+        # Outputs that already exist as another macro and were left alone
+        self.conflicts: List[Dict[str, str]] = []
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.actions_before = 0
+        self.actions_after = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+    
+    def add(self, result: Dict[str, Any]):
+        if result.get('error'):
+            self.failed += 1
+            return
+        self.files += 1
+        self.bytes_before += result['bytes_before']
+        self.bytes_after += result['bytes_after']
+        self.actions_before += result['actions_before']
+        self.actions_after += result['actions_after']
+    
+    def finish(self) -> 'BatchSummary':
+        self.elapsed = time.perf_counter() - self.started
+        return self
+    
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed or 1e-9
+        return {
+            'files': self.files,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'conflicts': self.conflicts,
+            'bytes_before': self.bytes_before,
+            'bytes_after': self.bytes_after,
+            'bytes_saved': self.bytes_before - self.bytes_after,
+            'actions_removed': self.actions_before - self.actions_after,
+            'seconds': self.elapsed,
+            'files_per_sec': self.files / elapsed,
+            'mb_per_sec': self.bytes_before / 1e6 / elapsed,
+            'actions_per_sec': self.actions_before / elapsed
+        }
+
+
+def _stat_key(path: str) -> Optional[List[float]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
+def _format_of(path: str) -> Optional[str]:
+    path, _ = compressed_io.split_codec(path)
+    for file_format, extension in MACRO_EXTENSIONS.items():
+        if path.endswith(extension):
+            return file_format
+    return None
+
+
+def process_file(source: str, output: str, optimize: Optional[Dict[str, Any]],
+                 time_quantum_us: Optional[int] = None) -> Dict[str, Any]:
+    # Runs in a worker process; everything it needs travels in the arguments
+    start = time.perf_counter()
+    result = {'source': source, 'output': output, 'source_stat': _stat_key(source)}
+    try:
+        storage = MacroStorage(os.path.dirname(output))
+        storage.set_time_quantum(time_quantum_us)
+        sequence = storage.load_sequence(source)
+        actions_before = len(sequence)
+        
+        if optimize is not None:
+            from optimizer import optimize_from_settings
+            sequence, _ = optimize_from_settings(sequence, optimize)
+        
+        storage.save_sequence(sequence, output)
+        # Sizes come from the stat taken up front, since the source may have been overwritten in place
+        result.update(
+            bytes_before=result['source_stat'][1],
+            bytes_after=os.path.getsize(output),
+            actions_before=actions_before,
+            actions_after=len(sequence),
+            output_stat=_stat_key(output)
+        )
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+class BatchJob:
+    def __init__(self, directory: str, file_format: Optional[str] = None, output_dir: Optional[str] = None,
+                 optimize: Optional[Dict[str, Any]] = None, workers: Optional[int] = None, resume: bool = True,
+                 compression: Optional[str] = None, time_quantum_us: Optional[int] = None,
+                 overwrite: bool = False):
+        self.directory = directory
+        self.file_format = file_format
+        # None keeps each file's compression; 'none' writes uncompressed files
+        self.compression = compression
+        self.time_quantum_us = time_quantum_us
+        self.output_dir = output_dir or directory
+        self.optimize = optimize
+        self.workers = workers or os.cpu_count() or 1
+        self.resume = resume
+        # Replace existing files that this job did not write itself
+        self.overwrite = overwrite
+        self.state_path = os.path.join(self.output_dir, STATE_FILE)
+        self.summary = BatchSummary()
+    
+    def _signature(self) -> str:
+        # A changed format or optimization pass invalidates earlier progress
+        return json.dumps([self.file_format, self.compression, self.time_quantum_us, self.optimize,
+                           os.path.abspath(self.output_dir)], sort_keys=True)
+    
+    def _read_state(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line from an interrupted run
+                    continue
+                if not entry.get('error'):
+                    yield entry
+    
+    def _load_state(self):
+        # Progress of earlier runs with the same settings, and which source wrote each output
+        # under any settings; the latter is kept with --restart so a rerun may replace its own files
+        done = {}
+        owners = {}
+        signature = self._signature()
+        for entry in self._read_state():
+            if entry.get('restart'):
+                # Progress made before a --restart with these settings no longer counts
+                if entry.get('signature') == signature:
+                    done.clear()
+                continue
+            owners[entry['output']] = entry['source']
+            if self.resume and entry.get('signature') == signature:
+                done[entry['source']] = entry
+        return done, owners
+    
+    def plan(self) -> List[tuple]:
+        done, owners = self._load_state()
+        outputs = {entry['output'] for entry in done.values()}
+        planned = set()
+        tasks = []
+        
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                source_format = _format_of(entry.name)
+                # Dot files are bookkeeping (this job's own state file is a .jsonl)
+                if source_format is None or entry.name.startswith('.') or not entry.is_file():
+                    continue
+                source = os.path.abspath(entry.path)
+                base, source_codec = compressed_io.split_codec(entry.name)
+                file_format = self.file_format or source_format
+                codec = source_codec if self.compression is None else None if self.compression == 'none' else self.compression
+                unchanged = (file_format == source_format and codec == source_codec
+                             and self.optimize is None and self.time_quantum_us is None)
+                if source in outputs or unchanged:
+                    self.summary.skipped += 1
+                    continue
+                
+                previous = done.get(source)
+                stat = _stat_key(source)
+                if previous and stat in (previous['source_stat'], previous.get('output_stat')):
+                    self.summary.skipped += 1
+                    continue
+                
+                filename = os.path.splitext(base)[0] + MACRO_EXTENSIONS[file_format]
+                if codec:
+                    filename += compressed_io.CODECS[codec]
+                output = os.path.abspath(os.path.join(self.output_dir, filename))
+                if output in planned:
+                    # e.g. a.json and a.jsonl.gz both converting to a.rmb: only the first is written
+                    self.summary.skipped += 1
+                    continue
+                if (not self.overwrite and output != source and owners.get(output) != source
+                        and os.path.exists(output)):
+                    # e.g. a.json converting to binary next to an unrelated a.rmb
+                    self.summary.skipped += 1
+                    self.summary.conflicts.append({'source': source, 'output': output})
+                    continue
+                planned.add(output)
+                tasks.append((stat[1], source, output))
+        
+        # Largest first keeps every worker busy until the end
+        tasks.sort(reverse=True)
+        return [(source, output) for _, source, output in tasks]
+    
+    def run(self) -> Iterator[Dict[str, Any]]:
+        # Yields one result per file as workers finish; each is appended to the state file
+        # before it is yielded, so an interrupted run resumes where it stopped. The file is only
+        # ever appended to: it also records which source owns each output.
+        tasks = self.plan()
+        os.makedirs(self.output_dir, exist_ok=True)
+        signature = self._signature()
+        
+        with open(self.state_path, 'a', encoding='utf-8') as state, \
+                ProcessPoolExecutor(max_workers=min(self.workers, max(1, len(tasks)))) as pool:
+            if not self.resume:
+                state.write(json.dumps({'restart': True, 'signature': signature}) + '\n')
+                state.flush()
+            futures = [pool.submit(process_file, source, output, self.optimize, self.time_quantum_us)
+                       for source, output in tasks]
+            for future in as_completed(futures):
+                result = future.result()
+                result['signature'] = signature
+                state.write(json.dumps(result) + '\n')
+                state.flush()
+                self.summary.add(result)
+                yield result
+        
+        self.summary.finish() 
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Analytics benchmark: analyze() time per macro size, numpy kernels vs the pure-Python fallback
+
+Usage: python benchmarks/bench_analytics.py [events ...]
+"""
+import sys
+import time
+
+from common import load_sample, tiled_events
+from action_buffer import ActionBuffer
+import analytics
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    sample = load_sample()
+    kernels = [False, True] if analytics.np is not None else [False]
+    print(f"{'events':>10} {'kernel':<7} {'time':>8} {'events/s':>12}")
+    
+    for count in sizes:
+        view = ActionBuffer.from_actions(tiled_events(sample, count)).view()
+        for use_numpy in kernels:
+            start = time.perf_counter()
+            analytics.analyze(view, use_numpy=use_numpy)
+            elapsed = time.perf_counter() - start
+            print(f"{count:>10} {'numpy' if use_numpy else 'python':<7} {elapsed:>7.3f}s {count / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
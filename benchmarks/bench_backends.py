@@ -0,0 +1,37 @@
+"""
+Input backend throughput: actions per second through MacroPlayer._execute_action
+
+Backends that cannot start here (no display, missing package) are reported and skipped.
+
+Usage: python benchmarks/bench_backends.py [actions] [backend ...]
+"""
+import sys
+import time
+
+from common import load_sample, tiled_events
+from backends import BACKENDS, create_backend
+from player import MacroPlayer
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    names = sys.argv[2:] or list(BACKENDS)
+    sequence = list(tiled_events(load_sample(), count))
+    
+    for name in names:
+        try:
+            backend = create_backend(name)
+        except Exception as e:
+            print(f"{name:<10} unavailable: {e}")
+            continue
+        
+        player = MacroPlayer(backend)
+        start = time.perf_counter()
+        for action in sequence:
+            player._execute_action(action)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<10} {count / elapsed:>12,.0f} actions/s  ({elapsed * 1e6 / count:.2f} us/action)")
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
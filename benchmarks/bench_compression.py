@@ -0,0 +1,57 @@
+"""
+Compression benchmark: ratio vs save/load time and load memory, per codec and format
+
+Load memory is the tracemalloc peak while loading, so it shows whether a format
+streams out of the decompressor or needs a full decompressed copy.
+
+Usage: python benchmarks/bench_compression.py [events]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import load_sample, tiled_events
+from action_buffer import ActionBuffer
+from compressed_io import available_codecs
+from storage import MacroStorage
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    buffer = ActionBuffer.from_actions(tiled_events(load_sample(), count))
+    view = buffer.view()
+    actions = view.to_list()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        storage = MacroStorage(directory)
+        print(f"events: {count}")
+        print(f"{'format':<7} {'codec':<6} {'size':>12} {'ratio':>7} {'save':>8} {'load':>8} {'load peak':>10}")
+        
+        for file_format in ('json', 'jsonl', 'binary'):
+            sequence = view if file_format == 'binary' else actions
+            raw_size = None
+            for codec in [None] + available_codecs():
+                start = time.perf_counter()
+                path = storage.save_sequence(sequence, f'bench_{file_format}', file_format, codec)
+                save_time = time.perf_counter() - start
+                size = os.path.getsize(path)
+                raw_size = raw_size or size
+                
+                tracemalloc.start()
+                start = time.perf_counter()
+                loaded = storage.load_sequence(path)
+                load_time = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                assert len(loaded) == count
+                del loaded
+                
+                print(f"{file_format:<7} {codec or 'none':<6} {size:>12,} {raw_size / size:>6.1f}x "
+                      f"{save_time:>7.2f}s {load_time:>7.2f}s {peak / 1e6:>8.1f}MB")
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
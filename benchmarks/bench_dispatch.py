@@ -0,0 +1,44 @@
+"""
+Per-action dispatch overhead: dict interpretation vs precompiled records
+
+Both paths drive a counting fake backend, so the numbers are pure player overhead.
+
+Usage: python benchmarks/bench_dispatch.py [actions]
+"""
+import sys
+import time
+
+from common import load_sample, tiled_events
+from action_program import compile_sequence
+from backends import RecordingBackend
+from player import MacroPlayer
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    sequence = list(tiled_events(load_sample(), count))
+    backend = RecordingBackend(keep_events=False)
+    player = MacroPlayer(backend)
+    
+    start = time.perf_counter()
+    for action in sequence:
+        player._execute_action(action)
+    interpreted = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    program = compile_sequence(sequence, backend)
+    compile_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for func, args, _offset, _skippable in program:
+        func(*args)
+    compiled = time.perf_counter() - start
+    
+    print(f"actions:      {count}")
+    print(f"interpreted:  {interpreted * 1e9 / count:8.0f} ns/action")
+    print(f"compiled:     {compiled * 1e9 / count:8.0f} ns/action  (one-off compile {compile_time * 1000:.0f} ms)")
+    print(f"speedup:      {interpreted / compiled:.2f}x per loop")
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Editor benchmark: cost of edits, seeks and materialization on a large macro
+
+Usage: python benchmarks/bench_editor.py [events] [edits]
+"""
+import sys
+import time
+
+from common import load_sample, tiled_events
+from action_buffer import ActionBuffer
+from editor import MacroEditor
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    view = ActionBuffer.from_actions(tiled_events(load_sample(), count)).view()
+    editor = MacroEditor(view)
+    step = editor.duration / (edits + 1) / 2
+    
+    start = time.perf_counter()
+    for i in range(edits):
+        editor.cut(i * step, i * step + step / 2)
+    cut_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for i in range(10000):
+        editor[i * len(editor) // 10000]
+        editor.index_at(i * editor.duration / 10000)
+    seek_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    editor.concatenate(view, 0.5)
+    concat_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    result = editor.to_view()
+    materialize_time = time.perf_counter() - start
+    
+    print(f"events: {count:,}  edits: {edits}  segments: {len(editor.segments)}  result: {len(result):,}")
+    print(f"cut      {cut_time / edits * 1e6:>10.1f} us per edit")
+    print(f"seek     {seek_time / 20000 * 1e6:>10.1f} us per lookup (index and time)")
+    print(f"concat   {concat_time * 1e6:>10.1f} us")
+    print(f"to_view  {materialize_time:>10.3f} s")
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Memory benchmark: list of dicts vs columnar ActionBuffer
+
+Usage: python benchmarks/bench_memory.py [events]
+"""
+import sys
+import time
+import tracemalloc
+
+from common import load_sample, tiled_events
+from action_buffer import ActionBuffer
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def main():
+    # ~10 minutes at 1000 Hz polling
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600000
+    sample = load_sample()
+    
+    dicts, dict_bytes, dict_peak, dict_time = measure(lambda: list(tiled_events(sample, count)))
+    del dicts
+    
+    def build_buffer():
+        buffer = ActionBuffer()
+        buffer.extend(tiled_events(sample, count))
+        return buffer
+    
+    buffer, buffer_bytes, buffer_peak, buffer_time = measure(build_buffer)
+    
+    print(f"events:          {count}")
+    print(f"list of dicts:   {dict_bytes / 1e6:8.1f} MB  (peak {dict_peak / 1e6:.1f} MB, {dict_time:.2f}s)")
+    print(f"ActionBuffer:    {buffer_bytes / 1e6:8.1f} MB  (peak {buffer_peak / 1e6:.1f} MB, {buffer_time:.2f}s)")
+    print(f"bytes per event: {dict_bytes / count:.0f} vs {buffer_bytes / count:.0f}")
+    print(f"reduction:       {dict_bytes / max(1, buffer_bytes):.1f}x")
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Scheduler benchmark: relative sleeps vs absolute deadlines
+
+Replays monmacro.json timing with a simulated per-action input cost and
+reports how far the replay duration drifts from recorded_duration / speed.
+
+Usage: python benchmarks/bench_scheduler.py [speed] [action_cost_ms]
+"""
+import sys
+import time
+
+from common import load_sample
+from scheduler import PlaybackScheduler
+
+
+def simulate_action(cost: float):
+    end = time.perf_counter() + cost
+    while time.perf_counter() < end:
+        pass
+
+
+def relative_sleep_replay(sequence, speed, cost):
+    # The pre-scheduler player loop: sleep the delta, then run the action
+    start = time.perf_counter()
+    last_timestamp = 0
+    for i, action in enumerate(sequence):
+        timestamp = action['timestamp']
+        if i > 0:
+            delay = (timestamp - last_timestamp) / speed
+            if delay > 0:
+                time.sleep(max(0.001, delay))
+        last_timestamp = timestamp
+        simulate_action(cost)
+    return time.perf_counter() - start
+
+
+def deadline_replay(sequence, speed, cost):
+    scheduler = PlaybackScheduler(speed)
+    scheduler.start()
+    for action in sequence:
+        if scheduler.wait_for(action['timestamp']):
+            simulate_action(cost)
+    return scheduler.finish().to_dict()
+
+
+def main():
+    speed = float(sys.argv[1]) if len(sys.argv) > 1 else 9.95
+    cost = (float(sys.argv[2]) if len(sys.argv) > 2 else 0.5) / 1000
+    sequence = load_sample()
+    expected = (sequence[-1]['timestamp'] - sequence[0]['timestamp']) / speed
+    
+    relative = relative_sleep_replay(sequence, speed, cost)
+    report = deadline_replay(sequence, speed, cost)
+    
+    print(f"actions: {len(sequence)}  speed: {speed}x  action cost: {cost * 1000:.2f} ms")
+    print(f"expected duration:  {expected:.3f}s")
+    print(f"relative sleeps:    {relative:.3f}s  (drift {relative - expected:+.3f}s)")
+    print(f"absolute deadlines: {report['actual_duration']:.3f}s  (drift {report['drift']:+.3f}s)")
+    print(f"lateness p50/p95/p99/max: {report['p50_lateness'] * 1000:.2f} / {report['p95_lateness'] * 1000:.2f} / "
+          f"{report['p99_lateness'] * 1000:.2f} / {report['max_lateness'] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Cold start: time to first frame, per-phase breakdown and the slowest imports
+
+Launches `main.py --profile-startup` (needs a display), which quits as soon as the
+last sequence has loaded and prints its startup marks. Exits non-zero when the
+median time to first frame is over budget.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--budget 1.0] [--imports 15]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from common import ROOT
+
+
+def launch():
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, 'main.py', '--profile-startup'],
+        cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    wall = time.perf_counter() - start
+    lines = [line for line in output.stdout.splitlines() if line.startswith('{')]
+    if not lines:
+        raise RuntimeError(output.stderr.strip().splitlines()[-1] if output.stderr.strip() else 'no startup report')
+    return wall, json.loads(lines[-1])
+
+
+def slowest_imports(count):
+    # -X importtime reports every module; only top-level imports are listed, by cumulative time
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    imports = []
+    for line in output.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name[1:]
+        if not name.startswith('  ') or name.startswith('   '):
+            continue
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RMouse startup benchmark")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=1.0, help="time-to-first-frame budget in seconds")
+    parser.add_argument('--imports', type=int, default=15, help="how many of the slowest imports to list")
+    options = parser.parse_args()
+    
+    print("slowest top-level imports (cumulative):")
+    for microseconds, name in slowest_imports(options.imports):
+        print(f"  {microseconds / 1000:8.1f} ms  {name}")
+    
+    walls = []
+    first_frames = []
+    reports = []
+    for _ in range(options.runs):
+        wall, report = launch()
+        walls.append(wall)
+        first_frames.append(report['marks']['first frame'])
+        reports.append(report)
+    
+    print("\nphases (last run):")
+    for phase in reports[-1]['phases']:
+        print(f"  {phase['phase']:<24} {phase['seconds'] * 1000:8.1f} ms  (at {phase['at'] * 1000:.1f} ms)")
+    
+    first_frame = statistics.median(first_frames)
+    print(f"\nruns:               {options.runs}")
+    print(f"first frame:        {first_frame * 1000:.0f} ms median (budget {options.budget * 1000:.0f} ms)")
+    print(f"process wall time:  {statistics.median(walls) * 1000:.0f} ms median")
+    
+    if first_frame > options.budget:
+        print("FAIL: time to first frame is over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
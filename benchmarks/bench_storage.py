@@ -0,0 +1,41 @@
+"""
+Storage benchmark: JSON vs binary (.rmb) save/load
+
+Usage: python benchmarks/bench_storage.py [events]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from common import load_sample, tiled_events
+from action_buffer import ActionBuffer
+from storage import MacroStorage
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    sequence = list(tiled_events(load_sample(), count))
+    buffer = ActionBuffer.from_actions(sequence)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        storage = MacroStorage(directory)
+        print(f"events: {count}")
+        print(f"{'format':<8} {'save':>8} {'load':>8} {'size':>10}")
+        
+        for file_format, source in (('json', sequence), ('binary', buffer.view())):
+            path, save_time = timed(lambda: storage.save_sequence(source, 'bench', file_format))
+            loaded, load_time = timed(lambda: storage.load_sequence(path))
+            assert len(loaded) == count
+            size = os.path.getsize(path)
+            print(f"{file_format:<8} {save_time:>7.2f}s {load_time:>7.2f}s {size / 1e6:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+SAMPLE_MACRO = os.path.join(ROOT, 'macros', 'monmacro.json')
+
+
+def load_sample():
+    with open(SAMPLE_MACRO, 'r', encoding='utf-8') as f:
+        return json.load(f)['sequence']
+
+
+def tiled_events(sample, count):
+    # Repeat the sample capture, shifting timestamps so the result looks like one long recording
+    span = sample[-1]['timestamp'] + 0.01
+    for i in range(count):
+        action = dict(sample[i % len(sample)])
+        action['timestamp'] += (i // len(sample)) * span
+        yield action 
+
+# Share of (mouse_move, click pair, scroll, key pair) per mix
+MIXES = {
+    'mouse': (0.97, 0.02, 0.01, 0.0),
+    'mixed': (0.70, 0.10, 0.05, 0.15),
+    'keys': (0.10, 0.05, 0.0, 0.85),
+}
+
+KEY_NAMES = ['a', 'e', 's', 't', 'Key.space', 'Key.enter', 'Key.shift', 'Key.ctrl_l', 'Key.backspace', 'Key.tab']
+
+
+def synthetic_events(count, mix='mixed', rate=1000.0, seed=0):
+    # Deterministic pseudo-recording: a wandering cursor at `rate` events per second
+    import random
+    rng = random.Random(seed)
+    move_share, click_share, scroll_share, _key_share = MIXES[mix]
+    x, y = 960, 540
+    interval = 1.0 / rate
+    produced = 0
+    
+    while produced < count:
+        timestamp = produced * interval
+        roll = rng.random()
+        if roll < move_share:
+            x = min(1919, max(0, x + rng.randint(-8, 8)))
+            y = min(1079, max(0, y + rng.randint(-8, 8)))
+            events = [{'type': 'mouse_move', 'x': x, 'y': y, 'timestamp': timestamp}]
+        elif roll < move_share + click_share:
+            button = 'left' if rng.random() < 0.8 else 'right'
+            events = [
+                {'type': 'mouse_press', 'x': x, 'y': y, 'button': button, 'timestamp': timestamp},
+                {'type': 'mouse_release', 'x': x, 'y': y, 'button': button, 'timestamp': timestamp + interval / 2},
+            ]
+        elif roll < move_share + click_share + scroll_share:
+            events = [{'type': 'mouse_scroll', 'x': x, 'y': y, 'dx': 0, 'dy': rng.choice((-1, 1)), 'timestamp': timestamp}]
+        else:
+            key = rng.choice(KEY_NAMES)
+            events = [
+                {'type': 'key_press', 'key': key, 'timestamp': timestamp},
+                {'type': 'key_release', 'key': key, 'timestamp': timestamp + interval / 2},
+            ]
+        
+        for event in events[:count - produced]:
+            produced += 1
+            yield event
+
+
+def peak_rss_mb():
+    # Process-wide high-water mark; None where the resource module is unavailable (Windows)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024 
\ No newline at end of file
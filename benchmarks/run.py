@@ -0,0 +1,181 @@
+"""
+Benchmark suite: playback throughput, timing jitter and storage load/save
+
+Every case runs in its own subprocess so peak RSS is measured per case.
+Playback goes through MacroPlayer.play_once with the in-memory fake
+backend, so no display is needed.
+
+Usage:
+    python benchmarks/run.py                          # default sizes
+    python benchmarks/run.py --sizes 1000 1000000 10000000 --output results.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import load_sample, synthetic_events, peak_rss_mb, MIXES
+from action_buffer import ActionBuffer
+from backends import RecordingBackend
+from player import MacroPlayer
+from playback_source import GeneratorSource
+from storage import MACRO_EXTENSIONS, MacroStorage
+
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+
+def run_playback(source, speed):
+    backend = RecordingBackend(keep_events=False)
+    player = MacroPlayer(backend)
+    player.load_sequence(source)
+    # Bypass the UI's 15x clamp so throughput cases are not bound by recorded timing
+    player.playback_speed = speed
+    
+    start = time.perf_counter()
+    report = player.play_once()
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'events': backend.count,
+        'seconds': elapsed,
+        'events_per_sec': backend.count / elapsed if elapsed else 0.0,
+        'lateness_p50_ms': report['p50_lateness'] * 1000,
+        'lateness_p95_ms': report['p95_lateness'] * 1000,
+        'lateness_p99_ms': report['p99_lateness'] * 1000,
+        'lateness_max_ms': report['max_lateness'] * 1000,
+        'drift_ms': report['drift'] * 1000,
+    }
+
+
+def case_throughput(size, mix):
+    # Streamed from a generator: measures the player loop, not sequence materialization
+    source = GeneratorSource(lambda: synthetic_events(size, mix), length=size)
+    return run_playback(source, speed=1e9)
+
+
+def case_timing(size, mix):
+    # Real-time playback at 1000 events/s, reported as lateness percentiles
+    return run_playback(list(synthetic_events(size, mix)), speed=1.0)
+
+
+def case_sample(speed):
+    return run_playback(load_sample(), speed=speed)
+
+
+def case_storage(size, mix, file_format):
+    buffer = ActionBuffer.from_actions(synthetic_events(size, mix))
+    sequence = buffer.view() if file_format == 'binary' else buffer.view().to_list()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        storage = MacroStorage(directory)
+        
+        start = time.perf_counter()
+        path = storage.save_sequence(sequence, 'bench', file_format)
+        save_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        loaded = storage.load_sequence(path)
+        load_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        first = next(iter(storage.open_source(path)))
+        open_time = time.perf_counter() - start
+        
+        assert len(loaded) == size and first
+        return {
+            'save_seconds': save_time,
+            'load_seconds': load_time,
+            'first_action_seconds': open_time,
+            'file_bytes': os.path.getsize(path),
+        }
+
+
+CASES = {
+    'throughput': case_throughput,
+    'timing': case_timing,
+    'sample': case_sample,
+    'storage': case_storage,
+}
+
+
+def run_single(name, args):
+    result = CASES[name](*args)
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def run_in_subprocess(name, args):
+    command = [sys.executable, os.path.abspath(__file__), '--single', name, json.dumps(args)]
+    output = subprocess.run(command, capture_output=True, text=True)
+    if output.returncode != 0:
+        return {'error': output.stderr.strip().splitlines()[-1] if output.stderr.strip() else 'failed'}
+    return json.loads(output.stdout)
+
+
+def plan(sizes, mixes, formats):
+    cases = [('sample', [9.95], 'monmacro.json @ 9.95x')]
+    for size in sizes:
+        for mix in mixes:
+            cases.append(('throughput', [size, mix], f'{size} {mix}'))
+    # Real-time cases are capped so the suite finishes in seconds
+    for mix in mixes:
+        cases.append(('timing', [min(sizes[0], 2000), mix], f'{min(sizes[0], 2000)} {mix} @ 1000/s'))
+    for size in sizes:
+        for file_format in formats:
+            if file_format == 'json' and size > 1000000:
+                continue
+            cases.append(('storage', [size, 'mixed', file_format], f'{size} {file_format}'))
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RMouse benchmark suite")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--mixes', nargs='+', default=list(MIXES), choices=list(MIXES))
+    parser.add_argument('--formats', nargs='+', default=list(MACRO_EXTENSIONS), choices=list(MACRO_EXTENSIONS))
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--single', nargs=2, metavar=('CASE', 'ARGS'), help=argparse.SUPPRESS)
+    options = parser.parse_args()
+    
+    if options.single:
+        name, args = options.single
+        print(json.dumps(run_single(name, json.loads(args))))
+        return
+    
+    results = []
+    for name, args, label in plan(sorted(options.sizes), options.mixes, options.formats):
+        result = run_in_subprocess(name, args)
+        results.append({'case': name, 'args': args, 'result': result})
+        
+        if 'error' in result:
+            summary = f"error: {result['error']}"
+        elif name == 'storage':
+            summary = (f"save {result['save_seconds']:.3f}s  load {result['load_seconds']:.3f}s  "
+                       f"first action {result['first_action_seconds'] * 1000:.1f}ms  "
+                       f"{result['file_bytes'] / 1e6:.1f}MB")
+        elif name == 'throughput':
+            # Every deadline is already due, so lateness only reflects queue position here
+            summary = f"{result['events_per_sec']:>12,.0f} ev/s"
+        else:
+            summary = (f"{result['events_per_sec']:>12,.0f} ev/s  p50/p95/p99 "
+                       f"{result['lateness_p50_ms']:.2f}/{result['lateness_p95_ms']:.2f}/"
+                       f"{result['lateness_p99_ms']:.2f} ms")
+        rss = result.get('peak_rss_mb')
+        print(f"{name:<11} {label:<24} {summary}  rss {rss:.0f}MB" if rss else f"{name:<11} {label:<24} {summary}")
+    
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': sys.version.split()[0],
+                'platform': sys.platform,
+                'results': results
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Compact binary macro file format (.rmb)
+
+Layout (little-endian):
+    header      magic "RMCB", version u16, flags u16, action count u32, key count u32
+    key table   key count x (length u16 + UTF-8 bytes), zero-padded to 4 bytes;
+                only names without a keymap id
+    columns     one fixed-width column per field, each `count` items long:
+                dt i64 (microseconds since previous action), x i32, y i32,
+                dx i32, dy i32, key i32 (keymap id, -1 = none, -2 - i = key table entry i),
+                type u8, button u8
+"""
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from typing import BinaryIO, List, Tuple
+
+from action_buffer import ActionBuffer
+from timeline import quantize_us
+
+
+MAGIC = b'RMCB'
+FORMAT_VERSION = 1
+# 64-bit microsecond deltas, so no single gap is too long to store
+DT_TYPECODE = 'q'
+EXTENSION = '.rmb'
+
+HEADER = struct.Struct('<4sHHII')
+KEY_LENGTH = struct.Struct('<H')
+
+# (ActionBuffer attribute, array typecode) in on-disk order; dt is derived from timestamps
+COLUMNS = (
+    ('xs', 'i'),
+    ('ys', 'i'),
+    ('dxs', 'i'),
+    ('dys', 'i'),
+    ('keys', 'i'),
+    ('types', 'B'),
+    ('buttons', 'B'),
+)
+
+NATIVE_LAYOUT = sys.byteorder == 'little'
+
+
+def is_binary_file(filepath: str) -> bool:
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _to_disk(column: array) -> bytes:
+    if not NATIVE_LAYOUT and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_disk(typecode: str, data: bytes) -> array:
+    column = array(typecode)
+    column.frombytes(data)
+    if not NATIVE_LAYOUT and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+
+def read_column(f: BinaryIO, typecode: str, count: int) -> array:
+    size = array(typecode).itemsize * count
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated binary macro data")
+    return _from_disk(typecode, data)
+
+
+def encode_deltas(timestamps, quantum_us: int = 1) -> array:
+    # Round absolute times first so rounding error never accumulates across deltas
+    deltas = array(DT_TYPECODE)
+    previous = 0
+    for timestamp in timestamps:
+        current = quantize_us(timestamp, quantum_us)
+        deltas.append(current - previous)
+        previous = current
+    return deltas
+
+
+def decode_deltas(deltas) -> array:
+    return array('d', [t / 1000000 for t in accumulate(deltas)])
+
+
+def column_offsets(count: int, data_offset: int) -> List[Tuple[str, str, int]]:
+    # (ActionBuffer attribute or 'dt', typecode, byte offset) for each on-disk column
+    offsets = [('dt', DT_TYPECODE, data_offset)]
+    offset = data_offset + array(DT_TYPECODE).itemsize * count
+    for attribute, typecode in COLUMNS:
+        offsets.append((attribute, typecode, offset))
+        offset += array(typecode).itemsize * count
+    return offsets
+
+
+def read_header(f: BinaryIO) -> Tuple[int, List[str], int]:
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError("Truncated binary macro header")
+    
+    magic, version, _flags, count, key_count = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not an RMouse binary macro")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary macro version: {version}")
+    
+    key_names = []
+    offset = HEADER.size
+    for _ in range(key_count):
+        (length,) = KEY_LENGTH.unpack(f.read(KEY_LENGTH.size))
+        key_names.append(f.read(length).decode('utf-8'))
+        offset += KEY_LENGTH.size + length
+    
+    padding = -offset % 4
+    f.read(padding)
+    return count, key_names, offset + padding
+
+
+def write_buffer(f: BinaryIO, buffer: ActionBuffer, count: int = None, quantum_us: int = 1):
+    count = len(buffer) if count is None else count
+    key_names = buffer.key_names
+    
+    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, count, len(key_names)))
+    offset = HEADER.size
+    for name in key_names:
+        encoded = name.encode('utf-8')
+        f.write(KEY_LENGTH.pack(len(encoded)))
+        f.write(encoded)
+        offset += KEY_LENGTH.size + len(encoded)
+    f.write(b'\0' * (-offset % 4))
+    
+    f.write(_to_disk(encode_deltas(buffer.timestamps[:count], quantum_us)))
+    for attribute, _typecode in COLUMNS:
+        f.write(_to_disk(getattr(buffer, attribute)[:count]))
+
+
+def read_buffer(f: BinaryIO) -> ActionBuffer:
+    count, key_names, _offset = read_header(f)
+    
+    buffer = ActionBuffer()
+    buffer.timestamps = decode_deltas(read_column(f, DT_TYPECODE, count))
+    for attribute, typecode in COLUMNS:
+        setattr(buffer, attribute, read_column(f, typecode, count))
+    buffer.set_key_names(key_names)
+    return buffer
+
+
+def save(filepath: str, buffer: ActionBuffer, count: int = None, quantum_us: int = 1):
+    with open(filepath, 'wb') as f:
+        write_buffer(f, buffer, count, quantum_us)
+
+
+def load(filepath: str) -> ActionBuffer:
+    with open(filepath, 'rb') as f:
+        return read_buffer(f) 
\ No newline at end of file
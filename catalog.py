@@ -0,0 +1,178 @@
+"""
+Persistent macro catalog: cached metadata for the macros directory
+"""
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Iterable, Optional
+
+from metrics import metrics
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS macros (
+    filepath TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    total_actions INTEGER,
+    duration REAL,
+    histogram TEXT,
+    thumbnail TEXT,
+    indexed_at REAL
+)
+"""
+
+# Analysis reports, keyed by file and by the options they were computed with
+ANALYSIS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    filepath TEXT NOT NULL,
+    options TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    report TEXT NOT NULL,
+    PRIMARY KEY (filepath, options)
+)
+"""
+
+COLUMNS = ('filepath', 'filename', 'name', 'mtime', 'size', 'total_actions', 'duration', 'histogram', 'thumbnail')
+
+
+class MacroCatalog:
+    def __init__(self, directory: str, extensions: Iterable[str],
+                 describe: Callable[[str], Dict[str, Any]], db_name: str = '.catalog.sqlite'):
+        self.directory = directory
+        # Longest first, so 'a.json.gz' matches '.json.gz' rather than a shorter suffix
+        self.extensions = tuple(sorted(extensions, key=len, reverse=True))
+        self.describe = describe
+        self.db_path = os.path.join(directory, db_name)
+        self.thumbnail_dir = os.path.join(directory, '.thumbnails')
+    
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=5)
+        connection.execute(SCHEMA)
+        connection.execute(ANALYSIS_SCHEMA)
+        return connection
+    
+    def refresh(self) -> int:
+        # Only files whose (mtime, size) changed are parsed again; returns how many were
+        if not os.path.isdir(self.directory):
+            return 0
+        
+        files = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                extension = next((suffix for suffix in self.extensions if entry.name.endswith(suffix)), None)
+                if extension is None or entry.name.startswith('.') or not entry.is_file():
+                    continue
+                name = entry.name[:-len(extension)]
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files[entry.path] = (entry.name, name, stat.st_mtime, stat.st_size)
+        
+        with closing(self._connect()) as connection:
+            known = {row[0]: (row[1], row[2]) for row in connection.execute("SELECT filepath, mtime, size FROM macros")}
+        
+        # Parsing happens before the write transaction, so other writers (a second scan,
+        # cached_analysis, the CLI) only ever wait for the short batch of row updates
+        stale = [(path,) for path in known if path not in files]
+        rows = [
+            self._index(path, filename, name, mtime, size)
+            for path, (filename, name, mtime, size) in files.items()
+            if known.get(path) != (mtime, size)
+        ]
+        if not stale and not rows:
+            return 0
+        
+        with closing(self._connect()) as connection, connection:
+            connection.executemany("DELETE FROM macros WHERE filepath = ?", stale)
+            connection.executemany("DELETE FROM analysis WHERE filepath = ?", stale)
+            connection.executemany("INSERT OR REPLACE INTO macros VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+    
+    def _index(self, path: str, filename: str, name: str, mtime: float, size: int) -> tuple:
+        try:
+            info = self.describe(path)
+        except Exception as e:
+            # Unreadable files stay listed, just without metadata
+            metrics.error('catalog.describe', e)
+            info = {}
+        
+        thumbnail = self._render_thumbnail(filename, info.get('points'))
+        return (
+            path, filename, name, mtime, size,
+            info.get('total_actions'),
+            info.get('duration'),
+            json.dumps(info.get('histogram', {})),
+            thumbnail,
+            time.time()
+        )
+    
+    def _render_thumbnail(self, name: str, points: Optional[List[tuple]]) -> Optional[str]:
+        if not points:
+            return None
+        try:
+            from PIL import Image, ImageDraw
+        except ImportError:
+            return None
+        
+        try:
+            os.makedirs(self.thumbnail_dir, exist_ok=True)
+            xs = [x for x, _ in points]
+            ys = [y for _, y in points]
+            left, top = min(xs), min(ys)
+            scale = 62 / max(1, max(xs) - left, max(ys) - top)
+            
+            image = Image.new('RGB', (64, 64), "#1a1a1f")
+            draw = ImageDraw.Draw(image)
+            draw.line([(1 + (x - left) * scale, 1 + (y - top) * scale) for x, y in points], fill="#a78bfa")
+            
+            path = os.path.join(self.thumbnail_dir, name + '.png')
+            image.save(path)
+            return path
+        except Exception as e:
+            metrics.error('catalog.thumbnail', e)
+            return None
+    
+    def entries(self) -> List[Dict[str, Any]]:
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM macros ORDER BY mtime DESC"
+            ).fetchall()
+        
+        entries = []
+        for row in rows:
+            entry = dict(zip(COLUMNS, row))
+            entry['histogram'] = json.loads(entry['histogram'] or '{}')
+            entry['modified'] = datetime.fromtimestamp(entry.pop('mtime')).strftime("%Y-%m-%d %H:%M:%S")
+            entries.append(entry)
+        return entries
+    
+    def cached_analysis(self, filepath: str, options: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        # Reports are reused while the file's (mtime, size) is unchanged
+        stat = os.stat(filepath)
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT mtime, size, report FROM analysis WHERE filepath = ? AND options = ?", (filepath, options)
+            ).fetchone()
+        if row and (row[0], row[1]) == (stat.st_mtime, stat.st_size):
+            return json.loads(row[2])
+        
+        report = compute()
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO analysis VALUES (?, ?, ?, ?, ?)",
+                (filepath, options, stat.st_mtime, stat.st_size, json.dumps(report))
+            )
+        return report
+    
+    def invalidate(self, filepath: str):
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM macros WHERE filepath = ?", (filepath,))
+            connection.execute("DELETE FROM analysis WHERE filepath = ?", (filepath,)) 
\ No newline at end of file
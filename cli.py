@@ -0,0 +1,357 @@
+"""
+Command-line entry point: play, convert, optimize and inspect macros without the GUI
+
+Usage:
+    python cli.py play macros/monmacro.json --speed 5 --loops 100
+    python cli.py play macros/monmacro.json --backend fake --metrics metrics.csv
+    python cli.py convert macros/monmacro.json --format binary
+    python cli.py convert macros/monmacro.json --format jsonl --compress gzip
+    python cli.py optimize macros/monmacro.json --tolerance 2 --output macros/small.rmb
+    python cli.py stats macros/
+    python cli.py analyze macros/monmacro.json --speeds 1 5 15
+    python cli.py edit macros/monmacro.json --trim 2 10 --append macros/other.rmb --output macros/joined.rmb
+    python cli.py batch macros/ --format binary --optimize --workers 8
+    python cli.py keys
+    python cli.py bench --sizes 1000 100000
+
+Nothing here imports tkinter or customtkinter.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from storage import MACRO_EXTENSIONS, MacroStorage
+from scheduler import LATE_POLICIES
+from compressed_io import available_codecs
+
+
+def _storage_for(path: str) -> MacroStorage:
+    # The storage directory holds the catalog; for a single file that is its own directory
+    directory = path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path))
+    return MacroStorage(directory)
+
+
+def _print_json(data):
+    print(json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def command_play(options) -> int:
+    from backends import create_backend
+    from player import MacroPlayer
+    from metrics import metrics
+    
+    # Enabled before loading so the load time is part of the export
+    metrics.enable(bool(options.metrics))
+    storage = _storage_for(options.file)
+    source = storage.open_source(options.file)
+    
+    player = MacroPlayer(create_backend(options.backend))
+    player.set_timing_options(options.late_policy)
+    player.set_gap_options(options.idle_threshold, options.idle_scale, options.max_gap)
+    player.set_playback_settings(options.speed, options.loops)
+    player.set_loop_gap(options.loop_gap)
+    player.load_sequence(source)
+    
+    if options.delay > 0:
+        time.sleep(options.delay)
+    
+    start = time.perf_counter()
+    if not player.play():
+        print("Nothing to play", file=sys.stderr)
+        return 1
+    try:
+        while player.play_thread.is_alive():
+            player.play_thread.join(0.5)
+            if options.progress:
+                progress = player.get_progress()
+                print(f"\rloop {progress['loop']}  {progress['current']}/{progress['total'] if progress['total'] is not None else '?'}", end='', file=sys.stderr)
+    except KeyboardInterrupt:
+        player.stop()
+        player.play_thread.join()
+    if options.progress:
+        print(file=sys.stderr)
+    
+    report = player.get_playback_report()
+    report['loops_completed'] = player.current_loop
+    report['wall_seconds'] = time.perf_counter() - start
+    if options.json:
+        _print_json(report)
+    else:
+        print(f"{len(source)} actions x {player.current_loop} loops in {report['wall_seconds']:.2f}s  "
+              f"(p99 lateness {report.get('p99_lateness', 0) * 1000:.2f} ms, drift {report.get('drift', 0) * 1000:+.1f} ms)")
+    if options.metrics:
+        metrics.export(options.metrics)
+    return 0
+
+
+def command_convert(options) -> int:
+    storage = _storage_for(options.file)
+    storage.set_time_quantum(options.quantum_us)
+    path = storage.convert_macro(options.file, options.format, options.compress)
+    print(f"{options.file} -> {path}  ({os.path.getsize(options.file)} -> {os.path.getsize(path)} bytes)")
+    return 0
+
+
+def command_optimize(options) -> int:
+    from optimizer import optimize_from_settings
+    
+    storage = _storage_for(options.file)
+    settings = storage.load_settings()
+    if options.tolerance is not None:
+        settings['path_tolerance'] = options.tolerance
+    if options.bucket is not None:
+        settings['move_bucket'] = options.bucket
+    if options.no_dedupe:
+        settings['dedupe_moves'] = False
+    
+    optimized, stats = optimize_from_settings(storage.open_source(options.file), settings, options.action_cost)
+    output = os.path.abspath(options.output or options.file)
+    path = storage.save_sequence(optimized, output)
+    
+    if options.json:
+        _print_json(dict(stats.to_dict(), output=path))
+    else:
+        print(f"{stats.original_actions} -> {stats.optimized_actions} actions "
+              f"({stats.to_dict()['reduction']:.0%} fewer, ~{stats.time_saved * 1000:.1f} ms saved per loop), "
+              f"saved to {path}")
+    return 0
+
+
+def command_stats(options) -> int:
+    if os.path.isdir(options.path):
+        macros = _storage_for(options.path).get_available_macros()
+        if options.json:
+            _print_json(macros)
+            return 0
+        for macro in macros:
+            actions = macro['total_actions'] if macro['total_actions'] is not None else '?'
+            print(f"{macro['filename']:<40} {actions:>10} actions  {macro['duration'] or 0:>9.1f}s  "
+                  f"{macro['size']:>12} bytes  {macro['modified']}")
+        print(f"{len(macros)} macros")
+        return 0
+    
+    from timeline import timing_profile
+    
+    storage = _storage_for(options.path)
+    info = storage.describe_macro(options.path)
+    info.pop('points', None)
+    info['file_bytes'] = os.path.getsize(options.path)
+    info['timing'] = timing_profile(storage.open_source(options.path).timestamps())
+    if options.json:
+        _print_json(info)
+    else:
+        print(f"{options.path}: {info['total_actions']} actions, {info['duration']:.2f}s, {info['file_bytes']} bytes")
+        for action_type, count in sorted(info['histogram'].items()):
+            print(f"  {action_type:<14} {count}")
+        timing = info['timing']
+        print(f"  intervals p50/p95/p99 {timing['p50_interval'] * 1000:.1f}/{timing['p95_interval'] * 1000:.1f}/"
+              f"{timing['p99_interval'] * 1000:.1f} ms, longest gap {timing['longest_gap']:.2f}s, "
+              f"{timing['idle_gaps']} idle gaps ({timing['idle_time']:.2f}s idle)")
+    return 0
+
+
+def command_analyze(options) -> int:
+    storage = _storage_for(options.file)
+    settings = {'idle_threshold': options.idle_threshold, 'speeds': options.speeds}
+    if options.action_cost is not None:
+        settings['action_cost'] = options.action_cost
+    report = storage.analyze_macro(options.file, **settings)
+    if options.json:
+        _print_json(report)
+        return 0
+    if not report['actions']:
+        print(f"{options.file}: empty")
+        return 0
+    
+    print(f"{options.file}: {report['actions']} actions, {report['duration']:.2f}s, "
+          f"{report['events_per_sec']:.0f} events/s (peak {report['rate']['peak_per_sec']:.0f}/s)")
+    print(f"  mouse path {report['path_length']:.0f} px, {report['clicks']} clicks")
+    print(f"  {report['idle_count']} idle gaps over {report['idle_threshold']:g}s, {report['idle_time']:.2f}s idle")
+    for cost in report['playback_cost']:
+        print(f"  at {cost['speed']:g}x: {cost['seconds']:.1f}s (max lag {cost['max_lag'] * 1000:.1f} ms)")
+    for label, count in zip(report['gaps']['labels'], report['gaps']['counts']):
+        if count:
+            print(f"  gap {label:<16} {count}")
+    return 0
+
+
+def command_edit(options) -> int:
+    storage = _storage_for(options.file)
+    editor = storage.open_editor(options.file)
+    # Applied in a fixed order: trim, then cuts (times after the trim), then appends
+    if options.trim:
+        editor.trim(*options.trim)
+    for start, end in options.cut or []:
+        editor.cut(start, end)
+    for filepath in options.append or []:
+        editor.concatenate(storage.load_sequence(filepath), options.gap)
+    
+    path = storage.save_edit(editor, os.path.abspath(options.output), compression=options.compress)
+    print(f"{path}: {len(editor)} actions, {editor.duration:.2f}s")
+    return 0
+
+
+def command_batch(options) -> int:
+    from batch import BatchJob
+    
+    optimize = None
+    if options.optimize:
+        optimize = _storage_for(options.directory).load_settings()
+        optimize = {
+            'dedupe_moves': not options.no_dedupe and optimize.get('dedupe_moves', True),
+            'path_tolerance': options.tolerance if options.tolerance is not None else optimize.get('path_tolerance', 1.0),
+            'move_bucket': options.bucket if options.bucket is not None else optimize.get('move_bucket', 0.0)
+        }
+    
+    job = BatchJob(options.directory, options.format, options.output_dir, optimize,
+                   workers=options.workers, resume=not options.restart, compression=options.compress,
+                   time_quantum_us=options.quantum_us, overwrite=options.overwrite)
+    for result in job.run():
+        name = os.path.basename(result['source'])
+        if result.get('error'):
+            print(f"FAILED {name}: {result['error']}", file=sys.stderr)
+        elif not options.json:
+            print(f"{name:<40} {result['bytes_before']:>12} -> {result['bytes_after']:>12} bytes  "
+                  f"{result['actions_before']:>9} -> {result['actions_after']:>9} actions  {result['seconds']:.2f}s")
+    
+    summary = job.summary.to_dict()
+    for conflict in summary['conflicts']:
+        print(f"SKIPPED {os.path.basename(conflict['source'])}: {os.path.basename(conflict['output'])} "
+              f"already exists (use --output-dir or --overwrite)", file=sys.stderr)
+    if options.json:
+        _print_json(summary)
+    else:
+        print(f"{summary['files']} files ({summary['skipped']} skipped, {summary['failed']} failed) in "
+              f"{summary['seconds']:.2f}s  ·  {summary['bytes_saved'] / 1e6:.1f} MB saved  ·  "
+              f"{summary['mb_per_sec']:.1f} MB/s  ·  {summary['files_per_sec']:.1f} files/s")
+    return 1 if summary['failed'] or summary['conflicts'] else 0
+
+
+def command_bench(options) -> int:
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'run.py')
+    return os.spawnv(os.P_WAIT, sys.executable, [sys.executable, script] + options.args)
+
+
+def command_keys(options) -> int:
+    import keymap
+    
+    report = keymap.coverage()
+    if options.json:
+        _print_json(report)
+    else:
+        print(f"{len(report['pynput_keys'])} pynput special keys, {len(report['unknown'])} without an id")
+        for name in report['unknown']:
+            print(f"  unknown: Key.{name}")
+        for name in report['no_pyautogui']:
+            print(f"  not replayable with pyautogui: Key.{name}")
+    # Only unknown keys fail the check: they would be recorded under an unstable name
+    return 1 if report['unknown'] else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='rmouse', description="RMouse command-line runner")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    play = commands.add_parser('play', help="replay a macro")
+    play.add_argument('file')
+    play.add_argument('--speed', type=float, default=1.0, help="playback speed, 0.1-15 (default 1)")
+    play.add_argument('--loops', type=int, default=1, help="number of loops, 0 = until interrupted")
+    play.add_argument('--loop-gap', type=float,
+                      help="pause between loops in seconds (default 0.5, or 0 with --loops 0)")
+    play.add_argument('--backend', default='pyautogui', help="input backend: pyautogui, pynput or fake")
+    play.add_argument('--late-policy', default='catch_up', choices=LATE_POLICIES)
+    play.add_argument('--idle-threshold', type=float, default=1.0, help="gaps longer than this (s) count as idle")
+    play.add_argument('--idle-scale', type=float, default=1.0, help="multiply the idle part of long gaps (0 = drop it)")
+    play.add_argument('--max-gap', type=float, help="never wait longer than this (s) between two actions")
+    play.add_argument('--delay', type=float, default=0.0, help="seconds to wait before starting")
+    play.add_argument('--progress', action='store_true', help="print progress to stderr")
+    play.add_argument('--json', action='store_true', help="print the timing report as JSON")
+    play.add_argument('--metrics', metavar='FILE', help="collect runtime metrics and export them (.json or .csv)")
+    play.set_defaults(handler=command_play)
+    
+    convert = commands.add_parser('convert', help="convert a macro to another file format")
+    convert.add_argument('file')
+    convert.add_argument('--format', required=True, choices=list(MACRO_EXTENSIONS))
+    convert.add_argument('--compress', choices=available_codecs(), help="compress the output")
+    convert.add_argument('--quantum-us', type=int,
+                         help="store integer microsecond deltas rounded to this quantum (error <= quantum/2)")
+    convert.set_defaults(handler=command_convert)
+    
+    optimize = commands.add_parser('optimize', help="thin out recorded mouse movement")
+    optimize.add_argument('file')
+    optimize.add_argument('--output', help="destination file (default: overwrite the input)")
+    optimize.add_argument('--tolerance', type=float, help="path simplification tolerance in pixels")
+    optimize.add_argument('--bucket', type=float, help="merge moves closer than this many seconds")
+    optimize.add_argument('--no-dedupe', action='store_true', help="keep repeated identical moves")
+    optimize.add_argument('--action-cost', type=float,
+                          help="seconds one input call takes, for the time-saved estimate (default: 0.001)")
+    optimize.add_argument('--json', action='store_true')
+    optimize.set_defaults(handler=command_optimize)
+    
+    stats = commands.add_parser('stats', help="summarize a macro file or every macro in a directory")
+    stats.add_argument('path')
+    stats.add_argument('--json', action='store_true')
+    stats.set_defaults(handler=command_stats)
+    
+    analyze = commands.add_parser('analyze', help="event rate, path, clicks, gaps and playback cost of a macro")
+    analyze.add_argument('file')
+    analyze.add_argument('--idle-threshold', type=float, default=1.0, help="gaps longer than this (s) count as idle")
+    analyze.add_argument('--speeds', type=float, nargs='+', default=[0.5, 1.0, 2.0, 5.0, 10.0, 15.0],
+                         help="playback speeds to estimate the duration for")
+    analyze.add_argument('--action-cost', type=float, help="seconds per injected event (default 0.0005)")
+    analyze.add_argument('--json', action='store_true')
+    analyze.set_defaults(handler=command_analyze)
+    
+    edit = commands.add_parser('edit', help="trim, cut and join macros")
+    edit.add_argument('file')
+    edit.add_argument('--trim', type=float, nargs=2, metavar=('START', 'END'), help="keep only this time range")
+    edit.add_argument('--cut', type=float, nargs=2, metavar=('START', 'END'), action='append',
+                      help="remove a time range and close the gap (repeatable)")
+    edit.add_argument('--append', metavar='FILE', action='append', help="append another macro (repeatable)")
+    edit.add_argument('--gap', type=float, default=0.5, help="seconds between appended macros (default 0.5)")
+    edit.add_argument('--compress', choices=available_codecs(), help="compress the output")
+    edit.add_argument('--output', required=True, help="destination file; the extension picks the format")
+    edit.set_defaults(handler=command_edit)
+    
+    batch = commands.add_parser('batch', help="convert and/or optimize every macro in a directory in parallel")
+    batch.add_argument('directory')
+    batch.add_argument('--format', choices=list(MACRO_EXTENSIONS), help="target format (default: keep each file's format)")
+    batch.add_argument('--output-dir', help="write results here instead of next to the sources")
+    batch.add_argument('--compress', choices=available_codecs() + ['none'],
+                       help="target compression (default: keep each file's)")
+    batch.add_argument('--optimize', action='store_true', help="apply the movement optimization passes")
+    batch.add_argument('--tolerance', type=float)
+    batch.add_argument('--bucket', type=float)
+    batch.add_argument('--no-dedupe', action='store_true')
+    batch.add_argument('--quantum-us', type=int, help="store quantized microsecond deltas (see convert)")
+    batch.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    batch.add_argument('--restart', action='store_true', help="ignore progress saved by an earlier run")
+    batch.add_argument('--overwrite', action='store_true',
+                       help="replace existing files this job did not write (default: skip them)")
+    batch.add_argument('--json', action='store_true')
+    batch.set_defaults(handler=command_batch)
+    
+    keys = commands.add_parser('keys', help="check the key table against the installed pynput")
+    keys.add_argument('--json', action='store_true')
+    keys.set_defaults(handler=command_keys)
+    
+    bench = commands.add_parser('bench', help="run the benchmark suite (arguments are passed through)")
+    bench.add_argument('args', nargs=argparse.REMAINDER)
+    bench.set_defaults(handler=command_bench)
+    
+    return parser
+
+
+def main(argv=None) -> int:
+    options = build_parser().parse_args(argv)
+    try:
+        return options.handler(options)
+    except Exception as e:
+        print(f"rmouse {options.command}: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main()) 
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Transparent compression for macro files
+"""
+import bz2
+import gzip
+import io
+import lzma
+from typing import List, IO, Optional, Tuple
+
+try:
+    # Python 3.14+ ships zstd; older versions can use the zstandard package
+    from compression import zstd as _zstd
+except ImportError:
+    try:
+        import zstandard as _zstd
+    except ImportError:
+        _zstd = None
+
+
+# Codec name -> file suffix appended after the macro extension (e.g. macro.json.gz)
+CODECS = {
+    'gzip': '.gz',
+    'bz2': '.bz2',
+    'lzma': '.xz',
+}
+if _zstd is not None:
+    CODECS['zstd'] = '.zst'
+
+SIGNATURES = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'lzma'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+
+
+def available_codecs() -> List[str]:
+    return list(CODECS)
+
+
+def split_codec(path: str) -> Tuple[str, Optional[str]]:
+    # 'a.json.gz' -> ('a.json', 'gzip'); uncompressed names come back unchanged
+    for codec, suffix in CODECS.items():
+        if path.endswith(suffix):
+            return path[:-len(suffix)], codec
+    return path, None
+
+
+def detect_codec(path: str) -> Optional[str]:
+    # Sniffed from the content, so a renamed file still opens
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for signature, codec in SIGNATURES:
+        if head.startswith(signature):
+            return codec
+    return None
+
+
+def open_compressed(path: str, mode: str = 'rb', codec: Optional[str] = None) -> IO[bytes]:
+    # Binary stream that (de)compresses on the fly; reading never holds the whole decompressed file
+    if codec is None and 'r' in mode:
+        codec = detect_codec(path)
+    if codec is None:
+        return open(path, mode)
+    
+    if codec == 'gzip':
+        return gzip.open(path, mode, compresslevel=6)
+    if codec == 'bz2':
+        return bz2.open(path, mode)
+    if codec == 'lzma':
+        return lzma.open(path, mode)
+    if codec == 'zstd' and _zstd is not None:
+        return _zstd.open(path, mode)
+    raise ValueError(f"Unsupported compression: {codec}")
+
+
+def open_text(path: str, mode: str = 'r', codec: Optional[str] = None) -> IO[str]:
+    stream = open_compressed(path, mode[0] + 'b', codec)
+    return io.TextIOWrapper(stream, encoding='utf-8') 
\ No newline at end of file
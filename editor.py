@@ -0,0 +1,247 @@
+"""
+Macro editing: cut, trim, splice and concatenate without copying the recorded actions
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Iterator, Optional
+
+from action_buffer import ActionBuffer, ActionView, NO_KEY
+from playback_source import SequenceSource
+
+
+class Segment:
+    # Rows [start, stop) of a buffer, played `shift` seconds later than recorded.
+    # Segments are never modified; edits build new ones.
+    __slots__ = ('buffer', 'start', 'stop', 'shift')
+    
+    def __init__(self, buffer: ActionBuffer, start: int, stop: int, shift: float = 0.0):
+        self.buffer = buffer
+        self.start = start
+        self.stop = stop
+        self.shift = shift
+    
+    def __len__(self) -> int:
+        return self.stop - self.start
+    
+    @property
+    def first_time(self) -> float:
+        return self.buffer.timestamps[self.start] + self.shift
+    
+    @property
+    def last_time(self) -> float:
+        return self.buffer.timestamps[self.stop - 1] + self.shift
+    
+    def shifted(self, delta: float) -> 'Segment':
+        return Segment(self.buffer, self.start, self.stop, self.shift + delta)
+    
+    def index_at(self, timestamp: float, after: bool = False) -> int:
+        # Row of the first action at (or, with `after`, past) `timestamp`; binary search
+        search = bisect_right if after else bisect_left
+        return search(self.buffer.timestamps, timestamp - self.shift, self.start, self.stop)
+
+
+def _as_buffer(sequence) -> ActionBuffer:
+    if isinstance(sequence, SequenceSource):
+        sequence = sequence.sequence
+    if isinstance(sequence, ActionView):
+        return sequence.buffer
+    return ActionBuffer.from_actions(sequence)
+
+
+class MacroEditor:
+    # A piece table over recorded buffers: edits only rearrange a short list of segments,
+    # so a cut in a million-event macro costs the same as in a ten-event one. Seeking by
+    # index or time is a bisect over segments, then one inside the segment. Action dicts
+    # are built on access, and to_view() copies the columns once when the result is needed.
+    def __init__(self, sequence=None):
+        self.segments: List[Segment] = []
+        if sequence is not None:
+            buffer = _as_buffer(sequence)
+            # A view may cover only part of its buffer
+            length = len(sequence) if isinstance(sequence, ActionView) else len(buffer)
+            if length:
+                self.segments.append(Segment(buffer, 0, length))
+        self._reindex()
+    
+    def _reindex(self):
+        # Prefix sums over the segment list; O(segments) per edit
+        self._offsets = []
+        self._times = array('d')
+        total = 0
+        for segment in self.segments:
+            self._offsets.append(total)
+            self._times.append(segment.first_time)
+            total += len(segment)
+        self._length = total
+    
+    def copy(self) -> 'MacroEditor':
+        # Shares the segments (they are immutable), so undo snapshots are cheap
+        editor = MacroEditor()
+        editor.segments = list(self.segments)
+        editor._reindex()
+        return editor
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    @property
+    def start_time(self) -> float:
+        return self.segments[0].first_time if self.segments else 0.0
+    
+    @property
+    def duration(self) -> float:
+        # Same meaning as PlaybackSource.duration: timestamp of the last action
+        return self.segments[-1].last_time if self.segments else 0.0
+    
+    def _locate(self, index: int):
+        position = bisect_right(self._offsets, index) - 1
+        segment = self.segments[position]
+        return segment, segment.start + index - self._offsets[position]
+    
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("action index out of range")
+        segment, row = self._locate(index)
+        action = segment.buffer.action(row)
+        action['timestamp'] += segment.shift
+        return action
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for segment in self.segments:
+            action = segment.buffer.action
+            shift = segment.shift
+            for row in range(segment.start, segment.stop):
+                item = action(row)
+                item['timestamp'] += shift
+                yield item
+    
+    def timestamps(self) -> Iterator[float]:
+        for segment in self.segments:
+            shift = segment.shift
+            for timestamp in segment.buffer.timestamps[segment.start:segment.stop]:
+                yield timestamp + shift
+    
+    def index_at(self, timestamp: float, after: bool = False) -> int:
+        # Index of the first action at `timestamp` or later (strictly later with `after`)
+        position = max(0, bisect_right(self._times, timestamp) - 1)
+        for position in range(position, len(self.segments)):
+            segment = self.segments[position]
+            row = segment.index_at(timestamp, after)
+            if row < segment.stop:
+                return self._offsets[position] + row - segment.start
+        return self._length
+    
+    def _split(self, index: int) -> int:
+        # Makes `index` the start of a segment; returns that segment's position
+        if index >= self._length:
+            return len(self.segments)
+        position = bisect_right(self._offsets, index) - 1
+        segment = self.segments[position]
+        row = segment.start + index - self._offsets[position]
+        if row == segment.start:
+            return position
+        self.segments[position:position + 1] = [
+            Segment(segment.buffer, segment.start, row, segment.shift),
+            Segment(segment.buffer, row, segment.stop, segment.shift)
+        ]
+        self._reindex()
+        return position + 1
+    
+    def _shift_from(self, position: int, delta: float):
+        if delta:
+            self.segments[position:] = [segment.shifted(delta) for segment in self.segments[position:]]
+    
+    def cut(self, start: float, end: float) -> int:
+        # Removes the actions in [start, end); later actions move back by end - start so
+        # the rest of the macro keeps its timing. Returns how many actions were removed.
+        if end <= start:
+            return 0
+        first = self._split(self.index_at(start))
+        last = self._split(self.index_at(end))
+        removed = sum(len(segment) for segment in self.segments[first:last])
+        del self.segments[first:last]
+        self._shift_from(first, start - end)
+        self._reindex()
+        return removed
+    
+    def trim(self, start: float, end: Optional[float] = None):
+        # Keeps the actions in [start, end] and rebases them so `start` becomes time 0
+        if end is not None:
+            del self.segments[self._split(self.index_at(end, after=True)):]
+            self._reindex()
+        del self.segments[:self._split(self.index_at(start))]
+        self._shift_from(0, -start)
+        self._reindex()
+    
+    def splice(self, timestamp: float, sequence, gap: float = 0.0):
+        # Inserts `sequence` so its first action runs at `timestamp`, after any actions already
+        # at that time; actions past it move later by the inserted span plus `gap`
+        other = sequence if isinstance(sequence, MacroEditor) else MacroEditor(sequence)
+        if not len(other):
+            return
+        position = self._split(self.index_at(timestamp, after=True))
+        span = other.duration - other.start_time
+        self._shift_from(position, span + gap)
+        self._insert(position, other, timestamp)
+    
+    def concatenate(self, sequence, gap: float = 0.0):
+        # Appends `sequence`, its first action `gap` seconds after the current last one; always
+        # lands after every existing action, even with gap 0
+        other = sequence if isinstance(sequence, MacroEditor) else MacroEditor(sequence)
+        if not len(other):
+            return
+        at = self.duration + gap if self.segments else 0.0
+        self._insert(len(self.segments), other, at)
+    
+    def _insert(self, position: int, other: 'MacroEditor', timestamp: float):
+        offset = timestamp - other.start_time
+        self.segments[position:position] = [segment.shifted(offset) for segment in other.segments]
+        self._reindex()
+    
+    def slice(self, start: float, end: float) -> 'MacroEditor':
+        # Copy of the actions in [start, end], rebased to start at 0; shares the buffers
+        editor = self.copy()
+        editor.trim(start, end)
+        return editor
+    
+    def to_buffer(self) -> ActionBuffer:
+        # Materializes the edit into one buffer: column slices, no action dicts
+        result = ActionBuffer()
+        key_maps = {}
+        for segment in self.segments:
+            source = segment.buffer
+            start, stop = segment.start, segment.stop
+            for name in ('types', 'xs', 'ys', 'buttons', 'dxs', 'dys'):
+                getattr(result, name).extend(getattr(source, name)[start:stop])
+            
+            # Keymap ids are shared by every buffer; only names without one are per buffer
+            # and need translating into the result's key table
+            if source.key_names:
+                mapping = key_maps.get(id(source))
+                if mapping is None:
+                    mapping = key_maps[id(source)] = [result.key_id(name) for name in source.key_names]
+                result.keys.extend(key if key >= NO_KEY else mapping[-2 - key] for key in source.keys[start:stop])
+            else:
+                result.keys.extend(source.keys[start:stop])
+            
+            shift = segment.shift
+            if shift:
+                result.timestamps.extend(timestamp + shift for timestamp in source.timestamps[start:stop])
+            else:
+                result.timestamps.extend(source.timestamps[start:stop])
+        return result
+    
+    def to_view(self) -> ActionView:
+        return self.to_buffer().view()
+    
+    def density(self, buckets: int) -> List[int]:
+        # Actions per time bucket over the whole macro: one seek per bucket edge, so drawing
+        # a timeline never walks the actions
+        if not self._length:
+            return [0] * buckets
+        start, end = self.start_time, self.duration
+        width = max(end - start, 1e-9) / buckets
+        edges = [self.index_at(start + i * width) for i in range(buckets)] + [self._length]
+        return [edges[i + 1] - edges[i] for i in range(buckets)] 
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+Bounded hand-off queue between input hook callbacks and the recorder
+"""
+import time
+from collections import deque
+from typing import Dict, Any, Callable, Tuple
+
+from metrics import metrics
+
+
+class EventQueue:
+    # deque.append/popleft are atomic under the GIL, so producers (pynput's mouse and
+    # keyboard threads) and the single consumer never take a lock. Counters are only
+    # updated by one side each or are best-effort statistics.
+    def __init__(self, capacity: int = 65536, late_threshold: float = 0.05):
+        self.capacity = capacity
+        self.late_threshold = late_threshold
+        self._events = deque()
+        self.received = 0
+        self.dropped = 0
+        self.late = 0
+        self.max_depth = 0
+        self.max_delay = 0.0
+        self.callback_time = 0.0
+        self.callback_max = 0.0
+    
+    def __len__(self) -> int:
+        return len(self._events)
+    
+    def push(self, event: Tuple, entered: float) -> bool:
+        # Called on the hook thread: a length check, an append and a few counter updates
+        self.received += 1
+        depth = len(self._events)
+        if depth >= self.capacity:
+            self.dropped += 1
+            metrics.count('recorder.dropped')
+            accepted = False
+        else:
+            self._events.append(event)
+            accepted = True
+            if depth >= self.max_depth:
+                self.max_depth = depth + 1
+        
+        elapsed = time.perf_counter() - entered
+        self.callback_time += elapsed
+        if elapsed > self.callback_max:
+            self.callback_max = elapsed
+        if metrics.enabled:
+            metrics.observe('recorder.callback', elapsed)
+        return accepted
+    
+    def drain(self, handler: Callable[[Tuple], None], clock: Callable[[], float] = None) -> int:
+        # Consumer side; `clock` is the clock the events' timestamps (last field) were taken on
+        events = self._events
+        count = 0
+        while True:
+            try:
+                event = events.popleft()
+            except IndexError:
+                return count
+            count += 1
+            if clock is not None:
+                delay = clock() - event[-1]
+                if delay > self.late_threshold:
+                    self.late += 1
+                if delay > self.max_delay:
+                    self.max_delay = delay
+                if metrics.enabled:
+                    metrics.observe('recorder.queue_delay', delay)
+            handler(event)
+    
+    def stats(self) -> Dict[str, Any]:
+        accepted = self.received - self.dropped
+        return {
+            'received': self.received,
+            'dropped': self.dropped,
+            'late': self.late,
+            'queued': len(self._events),
+            'max_depth': self.max_depth,
+            'max_queue_delay_ms': self.max_delay * 1000,
+            'callback_avg_us': self.callback_time / self.received * 1e6 if self.received else 0.0,
+            'callback_max_us': self.callback_max * 1e6,
+            'accepted': accepted
+        } 
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Append-only recording journal written in the background
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from action_buffer import ActionBuffer
+from metrics import metrics
+
+
+# Last line of a journal whose recording stopped cleanly
+CLOSED_MARKER = {"journal_closed": True}
+# Held while a journal is opened or retired, so retiring never removes a new recording's file
+_lock = threading.Lock()
+
+
+def is_closed(filepath: str) -> bool:
+    with open(filepath, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 256))
+        lines = f.read().splitlines()
+    try:
+        return bool(lines) and json.loads(lines[-1]) == CLOSED_MARKER
+    except ValueError:
+        return False
+
+
+def retire(filepath: str) -> bool:
+    # Called once the recording has been saved elsewhere. A journal still being written
+    # (a newer recording started meanwhile) has no marker and is left alone.
+    with _lock:
+        if not os.path.exists(filepath) or not is_closed(filepath):
+            return False
+        os.remove(filepath)
+        return True
+
+
+class RecordingJournal:
+    def __init__(self, filepath: str, buffer: ActionBuffer,
+                 batch_interval: float = 0.25, fsync_interval: float = 1.0):
+        self.filepath = filepath
+        self.buffer = buffer
+        self.batch_interval = batch_interval
+        self.fsync_interval = fsync_interval
+        self.written = 0
+        self.file = None
+        self.thread = None
+        self._stop = threading.Event()
+        self._last_fsync = 0.0
+    
+    def start(self):
+        # Same layout as a .jsonl macro: one header line, then one action per line
+        with _lock:
+            self.file = open(self.filepath, 'w', encoding='utf-8')
+        self.file.write(json.dumps({"created_at": datetime.now().isoformat(), "version": "1.0", "journal": True}) + '\n')
+        self.file.flush()
+        self._last_fsync = time.monotonic()
+        
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        while not self._stop.wait(self.batch_interval):
+            try:
+                self._write_batch()
+            except Exception as e:
+                metrics.error('journal.write', e)
+    
+    def _write_batch(self, force_sync: bool = False):
+        end = len(self.buffer)
+        if end > self.written:
+            action = self.buffer.action
+            self.file.write(''.join(json.dumps(action(i)) + '\n' for i in range(self.written, end)))
+            self.file.flush()
+            self.written = end
+        
+        now = time.monotonic()
+        if force_sync or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self.file.fileno())
+            self._last_fsync = now
+    
+    def close(self):
+        # Only the events of the last batch interval are left to write, whatever the capture size
+        if self.thread:
+            self._stop.set()
+            self.thread.join()
+            self.thread = None
+        
+        if self.file:
+            try:
+                self._write_batch()
+                self.file.write(json.dumps(CLOSED_MARKER) + '\n')
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            finally:
+                self.file.close()
+                self.file = None 
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+Key-name resolution shared by the recorder and the input backends
+"""
+import sys
+from typing import Dict, List, Optional, Any
+
+# Every pynput special key, in a fixed order: a key's id is SPECIAL_BASE + its index, so
+# new keys are only ever appended. Recorded as 'Key.<name>', like str(pynput.keyboard.Key.x).
+SPECIAL_KEYS = (
+    'alt', 'alt_l', 'alt_r', 'alt_gr', 'backspace', 'caps_lock', 'cmd', 'cmd_l', 'cmd_r',
+    'ctrl', 'ctrl_l', 'ctrl_r', 'delete', 'down', 'end', 'enter', 'esc',
+    'f1', 'f2', 'f3', 'f4', 'f5', 'f6', 'f7', 'f8', 'f9', 'f10', 'f11', 'f12',
+    'f13', 'f14', 'f15', 'f16', 'f17', 'f18', 'f19', 'f20', 'f21', 'f22', 'f23', 'f24',
+    'home', 'left', 'page_down', 'page_up', 'right', 'shift', 'shift_l', 'shift_r',
+    'space', 'tab', 'up', 'media_play_pause', 'media_volume_mute', 'media_volume_down',
+    'media_volume_up', 'media_previous', 'media_next', 'media_eject', 'insert', 'menu',
+    'num_lock', 'pause', 'print_screen', 'scroll_lock'
+)
+
+# Ids: a character's id is its code point; special keys and raw virtual-key codes
+# (keys pynput reports without a character) live above the Unicode range
+SPECIAL_BASE = 0x110000
+VK_BASE = 0x120000
+
+_COMMAND = 'command' if sys.platform == 'darwin' else 'win'
+
+# pynput special key name -> pyautogui.KEYBOARD_KEYS name; None where pyautogui has no equivalent
+PYAUTOGUI_NAMES = {
+    'alt': 'alt', 'alt_l': 'altleft', 'alt_r': 'altright', 'alt_gr': 'altright',
+    'backspace': 'backspace', 'caps_lock': 'capslock',
+    'cmd': _COMMAND, 'cmd_l': 'winleft' if _COMMAND == 'win' else 'command',
+    'cmd_r': 'winright' if _COMMAND == 'win' else 'command',
+    'ctrl': 'ctrl', 'ctrl_l': 'ctrlleft', 'ctrl_r': 'ctrlright',
+    'delete': 'delete', 'down': 'down', 'end': 'end', 'enter': 'enter', 'esc': 'esc',
+    'home': 'home', 'left': 'left', 'page_down': 'pagedown', 'page_up': 'pageup', 'right': 'right',
+    'shift': 'shift', 'shift_l': 'shiftleft', 'shift_r': 'shiftright',
+    'space': 'space', 'tab': 'tab', 'up': 'up',
+    'media_play_pause': 'playpause', 'media_volume_mute': 'volumemute',
+    'media_volume_down': 'volumedown', 'media_volume_up': 'volumeup',
+    'media_previous': 'prevtrack', 'media_next': 'nexttrack', 'media_eject': None,
+    'insert': 'insert', 'menu': 'apps', 'num_lock': 'numlock', 'pause': 'pause',
+    'print_screen': 'printscreen', 'scroll_lock': 'scrolllock'
+}
+PYAUTOGUI_NAMES.update({f'f{n}': f'f{n}' for n in range(1, 25)})
+
+_NAME_TO_ID: Dict[str, int] = {'Key.' + name: SPECIAL_BASE + i for i, name in enumerate(SPECIAL_KEYS)}
+_ID_TO_NAME: Dict[int, str] = {key: name for name, key in _NAME_TO_ID.items()}
+# pynput key object -> id, filled as keys are first seen
+_pynput_ids: Dict[Any, int] = {}
+
+
+def key_id(name: str) -> Optional[int]:
+    # Recorded key name -> id; None for names this module does not know
+    key = _NAME_TO_ID.get(name)
+    if key is not None:
+        return key
+    if len(name) == 1:
+        return ord(name)
+    if name.startswith('<') and name.endswith('>') and name[1:-1].isdigit():
+        return VK_BASE + int(name[1:-1])
+    return None
+
+
+def key_name(key: int) -> str:
+    if key < SPECIAL_BASE:
+        return chr(key)
+    if key >= VK_BASE:
+        return f'<{key - VK_BASE}>'
+    return _ID_TO_NAME[key]
+
+
+def special_name(key: int) -> str:
+    # 'Key.shift_r' -> 'shift_r'
+    return SPECIAL_KEYS[key - SPECIAL_BASE]
+
+
+def from_pynput(key) -> Optional[int]:
+    # Called on the recorder's consumer thread for every key event: one dict lookup once warm
+    try:
+        return _pynput_ids[key]
+    except KeyError:
+        pass
+    except TypeError:
+        return None
+    
+    name = getattr(key, 'name', None)
+    if name is not None:
+        resolved = _NAME_TO_ID.get('Key.' + name)
+    elif getattr(key, 'char', None):
+        resolved = ord(key.char) if len(key.char) == 1 else None
+    elif getattr(key, 'vk', None) is not None:
+        resolved = VK_BASE + key.vk
+    else:
+        resolved = None
+    if resolved is not None:
+        _pynput_ids[key] = resolved
+    return resolved
+
+
+def pyautogui_table(keyboard_keys) -> Dict[int, str]:
+    # Special key id -> pyautogui name, restricted to the names this pyautogui accepts
+    available = set(keyboard_keys)
+    return {
+        _NAME_TO_ID['Key.' + name]: target
+        for name, target in PYAUTOGUI_NAMES.items()
+        if target is not None and target in available
+    }
+
+
+def coverage(key_enum=None) -> Dict[str, List[str]]:
+    # Checks this table against the installed pynput: 'unknown' keys would be recorded with no
+    # id, 'no_pyautogui' keys are recorded but skipped by the pyautogui backend
+    if key_enum is None:
+        from pynput.keyboard import Key as key_enum
+    names = list(key_enum.__members__)
+    return {
+        'pynput_keys': names,
+        'unknown': [name for name in names if 'Key.' + name not in _NAME_TO_ID],
+        'no_pyautogui': [name for name in names if not PYAUTOGUI_NAMES.get(name)]
+    } 
\ No newline at end of file
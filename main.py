@@ -1,17 +1,25 @@
+from startup import profile
 import customtkinter as ctk
+profile.mark('import customtkinter')
 import threading
+import queue
+import json
+import sys
 import tkinter.messagebox as messagebox
 import tkinter.filedialog as filedialog
 from typing import Optional
 import os
-from pynput import keyboard
-from pynput.keyboard import Key, KeyCode
-import tkinter as tk
-from PIL import Image, ImageTk
 
+# pynput and pyautogui are imported on first use, after the window is up
 from recorder import MacroRecorder
-from player import MacroPlayer
+from player import MacroPlayer, DEFAULT_LOOP_GAP
 from storage import MacroStorage
+from editor import MacroEditor
+from optimizer import optimize_from_settings
+from backends import create_backend
+from progress import ProgressChannel
+from metrics import metrics
+profile.mark('import app modules')
 
 
 class ModernButton(ctk.CTkButton):
@@ -42,8 +50,157 @@ class GlassFrame(ctk.CTkFrame):
         super().__init__(*args, **kwargs)
 
 
+class VirtualMacroList(ctk.CTkFrame):
+    def __init__(self, parent, colors, on_load, visible_rows: int = 5, **kwargs):
+        kwargs['fg_color'] = kwargs.get('fg_color', "transparent")
+        super().__init__(parent, **kwargs)
+        
+        self.colors = colors
+        self.on_load = on_load
+        self.items = []
+        self.filtered = []
+        self.query = ''
+        self.offset = 0
+        self.visible_rows = visible_rows
+        
+        self.rows_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.rows_frame.pack(side="left", fill="both", expand=True)
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.empty_label = ctk.CTkLabel(
+            self.rows_frame,
+            text="",
+            font=ctk.CTkFont(family="Segoe UI", size=12),
+            text_color=colors['text_secondary']
+        )
+        
+        # Only `visible_rows` row widgets ever exist; scrolling rebinds them to other items
+        self.rows = [self._create_row() for _ in range(visible_rows)]
+        
+        for widget in (self, self.rows_frame):
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", lambda event: self.scroll_to(self.offset - 1))
+            widget.bind("<Button-5>", lambda event: self.scroll_to(self.offset + 1))
+    
+    def _create_row(self):
+        frame = ctk.CTkFrame(
+            self.rows_frame,
+            fg_color=self.colors['bg_tertiary'],
+            corner_radius=8,
+            height=50
+        )
+        frame.pack_propagate(False)
+        
+        info = ctk.CTkFrame(frame, fg_color="transparent")
+        info.pack(side="left", fill="both", expand=True, padx=15)
+        
+        name_label = ctk.CTkLabel(
+            info,
+            text="",
+            font=ctk.CTkFont(family="Segoe UI", size=14, weight="bold"),
+            text_color=self.colors['text_primary'],
+            anchor="w"
+        )
+        name_label.pack(fill="x", pady=(6, 0))
+        
+        details_label = ctk.CTkLabel(
+            info,
+            text="",
+            font=ctk.CTkFont(family="Segoe UI", size=11),
+            text_color=self.colors['text_secondary'],
+            anchor="w"
+        )
+        details_label.pack(fill="x", pady=(0, 6))
+        
+        load_button = ModernButton(
+            frame,
+            text="Load",
+            width=60,
+            height=30,
+            fg_color=(self.colors['accent_gradient_start'], self.colors['accent_gradient_end']),
+            hover_color=("#c4b5fd", "#8b5cf6"),
+            text_color=self.colors['text_primary'],
+            corner_radius=15,
+            font=ctk.CTkFont(family="Segoe UI", size=12)
+        )
+        load_button.pack(side="right", padx=10)
+        
+        for widget in (frame, info, name_label, details_label):
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", lambda event: self.scroll_to(self.offset - 1))
+            widget.bind("<Button-5>", lambda event: self.scroll_to(self.offset + 1))
+        
+        return frame, name_label, details_label, load_button
+    
+    def set_loading(self):
+        self.empty_label.configure(text="Scanning macros...")
+        self.empty_label.pack(pady=20)
+    
+    def set_items(self, items):
+        self.items = items
+        self.set_filter(self.query)
+    
+    def set_filter(self, query: str):
+        self.query = query.strip().lower()
+        if self.query:
+            self.filtered = [item for item in self.items if self.query in item['name'].lower()]
+        else:
+            self.filtered = self.items
+        self.scroll_to(0)
+    
+    def scroll_to(self, offset: int):
+        max_offset = max(0, len(self.filtered) - self.visible_rows)
+        self.offset = max(0, min(max_offset, offset))
+        self._render()
+        return "break"
+    
+    def _on_mousewheel(self, event):
+        return self.scroll_to(self.offset - (1 if event.delta > 0 else -1))
+    
+    def _on_scrollbar(self, *args):
+        total = len(self.filtered)
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self.visible_rows if args[2] == 'pages' else 1)
+            self.scroll_to(self.offset + step)
+    
+    def _render(self):
+        total = len(self.filtered)
+        
+        if total:
+            self.empty_label.pack_forget()
+        else:
+            self.empty_label.configure(text="No macros found" if self.items or self.query else "No saved macros yet")
+            self.empty_label.pack(pady=20)
+        
+        for index, (frame, name_label, details_label, load_button) in enumerate(self.rows):
+            item_index = self.offset + index
+            if item_index >= total:
+                frame.pack_forget()
+                continue
+            
+            macro = self.filtered[item_index]
+            details = macro['modified']
+            if macro.get('total_actions') is not None:
+                details += f"  ·  {macro['total_actions']} actions  ·  {macro['duration'] or 0:.1f}s"
+            
+            name_label.configure(text=macro['name'])
+            details_label.configure(text=details)
+            load_button.configure(command=lambda m=macro: self.on_load(m))
+            frame.pack(fill="x", pady=5)
+        
+        if total:
+            first = self.offset / total
+            self.scrollbar.set(first, min(1.0, first + self.visible_rows / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+
 class MacroAutomationApp:
-    def __init__(self):
+    def __init__(self, profile_startup: bool = False):
         # Set appearance
         ctk.set_appearance_mode("dark")
         
@@ -53,9 +210,13 @@ class MacroAutomationApp:
         self.storage = MacroStorage()
         
         self.current_sequence = []
+        # (path, sequence) of the last file loaded, to reuse its cached analysis
+        self.loaded_from = None
         self.settings = self.storage.load_settings()
+        self.last_optimization_stats = None
         
         self.hotkey_listener = None
+        self.profile_startup = profile_startup
         
         # Colors theme
         self.colors = {
@@ -78,15 +239,35 @@ class MacroAutomationApp:
         self.setup_main_window()
         self.setup_ui()
         self.setup_callbacks()
-        self.setup_global_hotkeys()
         self.load_settings()
+        profile.mark('ui built')
         
+        # Anything not needed to draw the window waits until the first frame has been painted
+        self.root.after_idle(lambda: self.root.after(0, self.on_first_frame))
+    
+    def on_first_frame(self):
+        profile.mark('first frame')
+        threading.Thread(target=self.finish_startup, daemon=True).start()
+    
+    def finish_startup(self):
+        self.setup_global_hotkeys()
+        self.load_backend()
+        profile.mark('input ready')
         self.load_last_sequence()
+        profile.mark('last sequence loaded')
+        
+        if self.profile_startup:
+            self.root.after(0, self.report_startup)
+    
+    def report_startup(self):
+        print(json.dumps(profile.to_dict()))
+        sys.stdout.flush()
+        self.root.quit()
     
     def setup_main_window(self):
         self.root = ctk.CTk()
         self.root.title("RMouse by akrm00")
-        self.root.geometry("600x550")
+        self.root.geometry("600x690")
         self.root.resizable(False, False)
         
         # Set window background
@@ -115,6 +296,9 @@ class MacroAutomationApp:
         
         # Settings section
         self.setup_settings_section(content_frame)
+        
+        # Status section
+        self.setup_status_section(content_frame)
     
     def setup_header(self, parent):
         header_frame = GlassFrame(
@@ -258,6 +442,51 @@ class MacroAutomationApp:
         )
         self.help_button.pack(side="right")
         
+        # Diagnostics button
+        self.diagnostics_button = ctk.CTkButton(
+            header_frame,
+            text="📊",
+            width=30,
+            height=30,
+            corner_radius=15,
+            font=ctk.CTkFont(family="Segoe UI", size=14),
+            fg_color=(self.colors['bg_tertiary'], self.colors['bg_tertiary']),
+            hover_color=(self.colors['accent_gradient_start'], self.colors['accent_gradient_start']),
+            text_color=self.colors['text_secondary'],
+            command=self.show_diagnostics_popup
+        )
+        self.diagnostics_button.pack(side="right", padx=(0, 8))
+        
+        # Analysis button
+        self.analysis_button = ctk.CTkButton(
+            header_frame,
+            text="📈",
+            width=30,
+            height=30,
+            corner_radius=15,
+            font=ctk.CTkFont(family="Segoe UI", size=14),
+            fg_color=(self.colors['bg_tertiary'], self.colors['bg_tertiary']),
+            hover_color=(self.colors['accent_gradient_start'], self.colors['accent_gradient_start']),
+            text_color=self.colors['text_secondary'],
+            command=self.show_analysis_popup
+        )
+        self.analysis_button.pack(side="right", padx=(0, 8))
+        
+        # Editor button
+        self.editor_button = ctk.CTkButton(
+            header_frame,
+            text="✂",
+            width=30,
+            height=30,
+            corner_radius=15,
+            font=ctk.CTkFont(family="Segoe UI", size=14),
+            fg_color=(self.colors['bg_tertiary'], self.colors['bg_tertiary']),
+            hover_color=(self.colors['accent_gradient_start'], self.colors['accent_gradient_start']),
+            text_color=self.colors['text_secondary'],
+            command=self.show_editor_popup
+        )
+        self.editor_button.pack(side="right", padx=(0, 8))
+        
         # Speed control
         speed_container = ctk.CTkFrame(settings_frame, fg_color="transparent")
         speed_container.pack(fill="x", padx=25, pady=(0, 15))
@@ -393,6 +622,455 @@ class MacroAutomationApp:
         )
         close_button.pack(pady=(20, 0))
     
+    def show_diagnostics_popup(self):
+        diagnostics_window = ctk.CTkToplevel(self.root)
+        diagnostics_window.title("Diagnostics")
+        diagnostics_window.geometry("520x420")
+        diagnostics_window.configure(fg_color=self.colors['bg_primary'])
+        diagnostics_window.transient(self.root)
+        
+        content_frame = GlassFrame(
+            diagnostics_window,
+            fg_color=self.colors['bg_secondary'],
+            corner_radius=15
+        )
+        content_frame.pack(fill="both", expand=True, padx=15, pady=15)
+        
+        # Header with title and collection switch
+        header_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
+        header_frame.pack(fill="x", padx=20, pady=(15, 10))
+        
+        ctk.CTkLabel(
+            header_frame,
+            text="📊 Diagnostics",
+            font=ctk.CTkFont(family="Segoe UI", size=16, weight="bold"),
+            text_color=self.colors['text_primary']
+        ).pack(side="left")
+        
+        def toggle_metrics():
+            metrics.enable(bool(enabled_switch.get()))
+            self.settings['metrics_enabled'] = metrics.enabled
+            self.storage.save_settings_async(self.settings)
+        
+        enabled_switch = ctk.CTkSwitch(
+            header_frame,
+            text="Collect",
+            command=toggle_metrics,
+            font=ctk.CTkFont(family="Segoe UI", size=12),
+            text_color=self.colors['text_secondary'],
+            progress_color=self.colors['accent_gradient_start']
+        )
+        if metrics.enabled:
+            enabled_switch.select()
+        enabled_switch.pack(side="right")
+        
+        metrics_text = ctk.CTkTextbox(
+            content_frame,
+            font=ctk.CTkFont(family="Consolas", size=11),
+            fg_color=self.colors['bg_tertiary'],
+            text_color=self.colors['text_primary'],
+            wrap="none"
+        )
+        metrics_text.pack(fill="both", expand=True, padx=20)
+        
+        def refresh():
+            if not diagnostics_window.winfo_exists():
+                return
+            metrics_text.configure(state="normal")
+            metrics_text.delete("1.0", "end")
+            metrics_text.insert("1.0", self.format_metrics())
+            metrics_text.configure(state="disabled")
+            diagnostics_window.after(1000, refresh)
+        
+        def export():
+            filename = filedialog.asksaveasfilename(
+                parent=diagnostics_window,
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json"), ("CSV files", "*.csv")]
+            )
+            if filename:
+                try:
+                    metrics.export(filename)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to export metrics: {str(e)}", parent=diagnostics_window)
+        
+        button_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
+        button_frame.pack(fill="x", padx=20, pady=15)
+        
+        for text, command in (("Export", export), ("Reset", metrics.reset), ("Close", diagnostics_window.destroy)):
+            ModernButton(
+                button_frame,
+                text=text,
+                command=command,
+                width=100,
+                height=35,
+                fg_color=(self.colors['bg_tertiary'], self.colors['bg_tertiary']),
+                hover_color=(self.colors['accent_gradient_start'], self.colors['accent_gradient_start']),
+                text_color=self.colors['text_primary'],
+                corner_radius=18,
+                font=ctk.CTkFont(family="Segoe UI", size=12)
+            ).pack(side="left", padx=(0, 10))
+        
+        refresh()
+    
+    def format_metrics(self) -> str:
+        lines = []
+        for row in metrics.rows():
+            if row['kind'] == 'counter':
+                lines.append(f"{row['metric']:<28} {row['count']:>10,}")
+            else:
+                lines.append(
+                    f"{row['metric']:<28} {row['count']:>10,}  p50 {row['p50_ms']:.3f}  "
+                    f"p95 {row['p95_ms']:.3f}  p99 {row['p99_ms']:.3f}  max {row['max_ms']:.3f} ms"
+                )
+        for name, message in metrics.snapshot()['last_errors'].items():
+            lines.append(f"last error in {name}: {message}")
+        if not lines:
+            lines.append("No data yet" if metrics.enabled else "Collection is off; errors are still counted")
+        return "\n".join(lines)
+    
+    def show_analysis_popup(self):
+        if not self.current_sequence:
+            messagebox.showwarning("No Sequence", "Please record or load a sequence first.")
+            return
+        
+        analysis_window = ctk.CTkToplevel(self.root)
+        analysis_window.title("Analysis")
+        analysis_window.geometry("560x640")
+        analysis_window.configure(fg_color=self.colors['bg_primary'])
+        analysis_window.transient(self.root)
+        
+        content_frame = GlassFrame(
+            analysis_window,
+            fg_color=self.colors['bg_secondary'],
+            corner_radius=15
+        )
+        content_frame.pack(fill="both", expand=True, padx=15, pady=15)
+        
+        title_label = ctk.CTkLabel(
+            content_frame,
+            text="📈 Analyzing...",
+            font=ctk.CTkFont(family="Segoe UI", size=16, weight="bold"),
+            text_color=self.colors['text_primary']
+        )
+        title_label.pack(pady=(15, 10), padx=20, anchor="w")
+        
+        # Click heatmap and event rate over time
+        canvas_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
+        canvas_frame.pack(fill="x", padx=20)
+        heatmap_canvas = ctk.CTkCanvas(canvas_frame, width=320, height=180, highlightthickness=0, bg=self.colors['bg_tertiary'])
+        heatmap_canvas.pack(side="left")
+        rate_canvas = ctk.CTkCanvas(canvas_frame, width=180, height=180, highlightthickness=0, bg=self.colors['bg_tertiary'])
+        rate_canvas.pack(side="right")
+        
+        report_text = ctk.CTkTextbox(
+            content_frame,
+            font=ctk.CTkFont(family="Consolas", size=11),
+            fg_color=self.colors['bg_tertiary'],
+            text_color=self.colors['text_primary'],
+            wrap="none"
+        )
+        report_text.pack(fill="both", expand=True, padx=20, pady=15)
+        
+        # Computed off the Tk thread; files loaded unchanged reuse the report cached in the catalog
+        sequence = self.current_sequence
+        options = {'idle_threshold': self.settings.get('idle_threshold', 1.0)}
+        action_cost = self.measured_action_cost()
+        if action_cost is not None:
+            options['action_cost'] = action_cost
+        results = queue.Queue()
+        
+        def compute():
+            try:
+                if self.loaded_from and self.loaded_from[1] is sequence:
+                    results.put(self.storage.analyze_macro(self.loaded_from[0], **options))
+                else:
+                    import analytics
+                    results.put(analytics.analyze(sequence, **options))
+            except Exception as e:
+                metrics.error('app.analysis', e)
+                results.put(None)
+        
+        def poll():
+            if not analysis_window.winfo_exists():
+                return
+            try:
+                report = results.get_nowait()
+            except queue.Empty:
+                analysis_window.after(50, poll)
+                return
+            if report is None:
+                title_label.configure(text="📈 Analysis failed")
+                return
+            title_label.configure(text="📈 Analysis")
+            self.draw_analysis(report, heatmap_canvas, rate_canvas)
+            report_text.insert("1.0", self.format_analysis(report))
+            report_text.configure(state="disabled")
+        
+        threading.Thread(target=compute, daemon=True).start()
+        analysis_window.after(50, poll)
+    
+    def measured_action_cost(self) -> Optional[float]:
+        # Per-action cost measured by metrics during earlier playbacks, if any; two significant
+        # digits, so small variations still hit the cached report
+        histogram = metrics.snapshot()['histograms'].get('player.action')
+        if histogram and histogram['count']:
+            return float(f"{histogram['mean_ms'] / 1000:.2g}")
+        return None
+    
+    def draw_analysis(self, report, heatmap_canvas, rate_canvas):
+        if not report.get('actions'):
+            return
+        heatmap = report['heatmap']
+        cell_width = 320 / heatmap['columns']
+        cell_height = 180 / heatmap['rows']
+        peak = max(max(row) for row in heatmap['counts']) or 1
+        for y, row in enumerate(heatmap['counts']):
+            for x, count in enumerate(row):
+                if count:
+                    # Brighter cells got more clicks
+                    level = 80 + int(175 * count / peak)
+                    heatmap_canvas.create_rectangle(
+                        x * cell_width, y * cell_height, (x + 1) * cell_width, (y + 1) * cell_height,
+                        fill=f"#{level // 2:02x}{level // 3:02x}{level:02x}", width=0
+                    )
+        
+        counts = report['rate']['counts']
+        bar_width = 180 / len(counts)
+        top = max(counts) or 1
+        for i, count in enumerate(counts):
+            height = 170 * count / top
+            rate_canvas.create_rectangle(
+                i * bar_width, 180 - height, (i + 1) * bar_width, 180,
+                fill=self.colors['accent_gradient_start'], width=0
+            )
+    
+    def format_analysis(self, report) -> str:
+        if not report.get('actions'):
+            return "Empty sequence"
+        lines = [
+            f"{report['actions']:,} actions over {report['duration']:.1f}s "
+            f"({report['events_per_sec']:.0f}/s, peak {report['rate']['peak_per_sec']:.0f}/s)",
+            f"mouse path {report['path_length']:,.0f} px, {report['clicks']:,} clicks",
+            f"{report['idle_count']} idle gaps over {report['idle_threshold']:g}s, {report['idle_time']:.1f}s idle",
+            "",
+            "playback time by speed:"
+        ]
+        for cost in report['playback_cost']:
+            lines.append(f"  {cost['speed']:>5g}x  {cost['seconds']:>10.1f}s   max lag {cost['max_lag'] * 1000:.1f} ms")
+        lines.append("")
+        lines.append("gaps between events:")
+        for label, count in zip(report['gaps']['labels'], report['gaps']['counts']):
+            if count:
+                lines.append(f"  {label:<16} {count:>10,}")
+        return "\n".join(lines)
+    
+    def show_editor_popup(self):
+        if not self.current_sequence:
+            messagebox.showwarning("No Sequence", "Please record or load a sequence first.")
+            return
+        if self.player.is_playing or self.recorder.is_recording:
+            return
+        
+        editor_window = ctk.CTkToplevel(self.root)
+        editor_window.title("Edit Macro")
+        editor_window.geometry("560x380")
+        editor_window.configure(fg_color=self.colors['bg_primary'])
+        editor_window.transient(self.root)
+        
+        content_frame = GlassFrame(
+            editor_window,
+            fg_color=self.colors['bg_secondary'],
+            corner_radius=15
+        )
+        content_frame.pack(fill="both", expand=True, padx=15, pady=15)
+        
+        info_label = ctk.CTkLabel(
+            content_frame,
+            text="Loading...",
+            font=ctk.CTkFont(family="Segoe UI", size=14, weight="bold"),
+            text_color=self.colors['text_primary']
+        )
+        info_label.pack(pady=(15, 10), padx=20, anchor="w")
+        
+        # Timeline: action density over time; drag to select a time range
+        width, height = 500, 100
+        timeline = ctk.CTkCanvas(content_frame, width=width, height=height, highlightthickness=0, bg=self.colors['bg_tertiary'])
+        timeline.pack(padx=20)
+        
+        selection_label = ctk.CTkLabel(
+            content_frame,
+            text="Drag on the timeline to select a range",
+            font=ctk.CTkFont(family="Segoe UI", size=12),
+            text_color=self.colors['text_secondary']
+        )
+        selection_label.pack(pady=(5, 10), padx=20, anchor="w")
+        
+        state = {'editor': None, 'history': [], 'selection': None, 'anchor': 0}
+        
+        def time_at(x):
+            editor = state['editor']
+            span = editor.duration - editor.start_time
+            return editor.start_time + max(0, min(width, x)) / width * span
+        
+        def x_at(timestamp):
+            editor = state['editor']
+            span = editor.duration - editor.start_time
+            return (timestamp - editor.start_time) / span * width if span else 0
+        
+        def redraw():
+            editor = state['editor']
+            timeline.delete("all")
+            info_label.configure(text=f"{len(editor):,} actions  ·  {editor.duration:.2f}s  ·  {len(editor.segments)} segments")
+            counts = editor.density(width // 2)
+            top = max(counts) if counts else 0
+            for i, count in enumerate(counts):
+                if count:
+                    bar = (height - 4) * count / top
+                    timeline.create_rectangle(i * 2, height - bar, i * 2 + 2, height,
+                                              fill=self.colors['accent_gradient_start'], width=0)
+            selection = state['selection']
+            if selection:
+                start, end = selection
+                timeline.create_rectangle(x_at(start), 0, x_at(end), height, outline="#ffffff", fill="#ffffff", stipple="gray25")
+                count = editor.index_at(end, after=True) - editor.index_at(start)
+                selection_label.configure(text=f"Selected {start:.2f}s - {end:.2f}s  ·  {count:,} actions")
+            else:
+                selection_label.configure(text="Drag on the timeline to select a range")
+        
+        def on_press(event):
+            if state['editor'] is None:
+                return
+            state['anchor'] = event.x
+            state['selection'] = None
+            redraw()
+        
+        def on_drag(event):
+            if state['editor'] is None:
+                return
+            left, right = sorted((state['anchor'], event.x))
+            state['selection'] = (time_at(left), time_at(right))
+            redraw()
+        
+        timeline.bind("<Button-1>", on_press)
+        timeline.bind("<B1-Motion>", on_drag)
+        
+        def edit(operation):
+            # Edits only touch the segment list, so each undo step is a cheap copy
+            editor = state['editor']
+            if editor is None:
+                return
+            state['history'].append(editor.copy())
+            operation(editor)
+            state['selection'] = None
+            redraw()
+        
+        def trim():
+            if state['selection']:
+                edit(lambda editor: editor.trim(*state['selection']))
+        
+        def cut():
+            if state['selection']:
+                edit(lambda editor: editor.cut(*state['selection']))
+        
+        def append():
+            filename = filedialog.askopenfilename(
+                parent=editor_window,
+                title="Append Macro",
+                filetypes=[("Macro files", "*.json *.jsonl *.rmb *.gz *.bz2 *.xz *.zst"), ("All files", "*.*")],
+                initialdir=self.storage.default_path
+            )
+            if filename:
+                try:
+                    other = self.storage.load_sequence(filename)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to load: {str(e)}", parent=editor_window)
+                    return
+                gap = self.settings.get('loop_gap')
+                edit(lambda editor: editor.concatenate(other, DEFAULT_LOOP_GAP if gap is None else gap))
+        
+        def undo():
+            if state['history']:
+                state['editor'] = state['history'].pop()
+                state['selection'] = None
+                redraw()
+        
+        def apply():
+            if state['editor'] is None:
+                return
+            sequence = state['editor'].to_view()
+            self.current_sequence = sequence
+            self.loaded_from = None
+            self.player.load_sequence(sequence)
+            editor_window.destroy()
+        
+        def save_as():
+            if state['editor'] is None:
+                return
+            filename = filedialog.asksaveasfilename(
+                parent=editor_window,
+                title="Save Edited Macro As",
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json"), ("JSON Lines", "*.jsonl"), ("RMouse binary", "*.rmb"), ("All files", "*.*")],
+                initialdir=self.storage.default_path
+            )
+            if filename:
+                self.storage.save_sequence_async(
+                    state['editor'].to_view(),
+                    os.path.basename(filename),
+                    compression=self.settings.get('compression'),
+                    callback=self.save_callback(os.path.basename(filename))
+                )
+        
+        for row in ((("Trim", trim), ("Cut", cut), ("Append...", append), ("Undo", undo)),
+                    (("Apply", apply), ("Save As...", save_as), ("Close", editor_window.destroy))):
+            button_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
+            button_frame.pack(fill="x", padx=20, pady=(5, 0))
+            for text, command in row:
+                ModernButton(
+                    button_frame,
+                    text=text,
+                    command=command,
+                    width=100,
+                    height=35,
+                    fg_color=(self.colors['bg_tertiary'], self.colors['bg_tertiary']),
+                    hover_color=(self.colors['accent_gradient_start'], self.colors['accent_gradient_start']),
+                    text_color=self.colors['text_primary'],
+                    corner_radius=18,
+                    font=ctk.CTkFont(family="Segoe UI", size=12)
+                ).pack(side="left", padx=(0, 10))
+        
+        # Streaming sources are read into columns once, off the Tk thread
+        sequence = self.current_sequence
+        results = queue.Queue()
+        
+        def build():
+            try:
+                if self.loaded_from and self.loaded_from[1] is sequence:
+                    results.put(self.storage.open_editor(self.loaded_from[0]))
+                else:
+                    results.put(MacroEditor(sequence))
+            except Exception as e:
+                metrics.error('app.editor', e)
+                results.put(None)
+        
+        def poll():
+            if not editor_window.winfo_exists():
+                return
+            try:
+                editor = results.get_nowait()
+            except queue.Empty:
+                editor_window.after(50, poll)
+                return
+            if editor is None:
+                info_label.configure(text="Could not open the sequence")
+                return
+            state['editor'] = editor
+            redraw()
+        
+        threading.Thread(target=build, daemon=True).start()
+        editor_window.after(50, poll)
+    
     def setup_status_section(self, parent):
         # Status frame
         status_frame = GlassFrame(
@@ -401,30 +1079,52 @@ class MacroAutomationApp:
             corner_radius=15,
             height=120
         )
-        status_frame.pack(fill="x")
+        status_frame.pack(fill="x", pady=(0, 20))
         status_frame.pack_propagate(False)
         
         # Status content
         status_content = ctk.CTkFrame(status_frame, fg_color="transparent")
-        status_content.pack(expand=True)
+        status_content.pack(fill="x", expand=True, padx=25)
+        
+        status_row = ctk.CTkFrame(status_content, fg_color="transparent")
+        status_row.pack(fill="x")
         
         # Status icon
         self.status_icon = ctk.CTkLabel(
-            status_content,
+            status_row,
             text="✓",
-            font=ctk.CTkFont(family="Segoe UI", size=24),
+            font=ctk.CTkFont(family="Segoe UI", size=20),
             text_color=self.colors['accent_success']
         )
-        self.status_icon.pack()
+        self.status_icon.pack(side="left", padx=(0, 10))
         
         # Status text
         self.status_label = ctk.CTkLabel(
-            status_content,
+            status_row,
             text="Ready",
             font=ctk.CTkFont(family="Segoe UI", size=16, weight="bold"),
             text_color=self.colors['text_primary']
         )
-        self.status_label.pack(pady=(5, 0))
+        self.status_label.pack(side="left")
+        
+        # Progress counters and ETA
+        self.progress_label = ctk.CTkLabel(
+            status_row,
+            text="",
+            font=ctk.CTkFont(family="Segoe UI", size=12),
+            text_color=self.colors['text_secondary']
+        )
+        self.progress_label.pack(side="right")
+        
+        # Progress bar
+        self.progress_bar = ctk.CTkProgressBar(
+            status_content,
+            height=8,
+            progress_color=(self.colors['accent_gradient_start'], self.colors['accent_gradient_end']),
+            fg_color=(self.colors['bg_tertiary'], self.colors['bg_tertiary'])
+        )
+        self.progress_bar.set(0)
+        self.progress_bar.pack(fill="x", pady=(10, 0))
         
         # Hotkey hint
         hotkey_label = ctk.CTkLabel(
@@ -433,7 +1133,7 @@ class MacroAutomationApp:
             font=ctk.CTkFont(family="Segoe UI", size=12),
             text_color=self.colors['text_secondary']
         )
-        hotkey_label.pack(pady=(5, 0))
+        hotkey_label.pack(pady=(5, 0), anchor="w")
     
     def show_saveload_menu(self):
         saveload_window = ctk.CTkToplevel(self.root)
@@ -517,88 +1217,94 @@ class MacroAutomationApp:
         )
         load_button.pack(pady=(0, 20), padx=20, fill="x")
         
-        # Recent macros
-        macros = self.storage.get_available_macros()
-        if macros:
-            recent_frame = GlassFrame(
-                content_frame,
-                fg_color=self.colors['bg_secondary'],
-                corner_radius=15
-            )
-            recent_frame.pack(fill="both", expand=True)
-            
-            ctk.CTkLabel(
-                recent_frame,
-                text="RECENT MACROS",
-                font=ctk.CTkFont(family="Segoe UI", size=12, weight="bold"),
-                text_color=self.colors['text_secondary']
-            ).pack(pady=(15, 10), padx=20, anchor="w")
-            
-            # Scrollable frame for macros
-            macros_container = ctk.CTkScrollableFrame(
-                recent_frame,
-                fg_color="transparent",
-                height=200
-            )
-            macros_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
-            
-            for macro in macros[:10]:
-                macro_frame = ctk.CTkFrame(
-                    macros_container,
-                    fg_color=self.colors['bg_tertiary'],
-                    corner_radius=8,
-                    height=50
-                )
-                macro_frame.pack(fill="x", pady=5)
-                macro_frame.pack_propagate(False)
-                
-                macro_info = ctk.CTkFrame(macro_frame, fg_color="transparent")
-                macro_info.pack(side="left", fill="both", expand=True, padx=15)
-                
-                ctk.CTkLabel(
-                    macro_info,
-                    text=macro['name'],
-                    font=ctk.CTkFont(family="Segoe UI", size=14, weight="bold"),
-                    text_color=self.colors['text_primary'],
-                    anchor="w"
-                ).pack(fill="x", pady=(10, 0))
-                
-                ctk.CTkLabel(
-                    macro_info,
-                    text=macro['modified'],
-                    font=ctk.CTkFont(family="Segoe UI", size=11),
-                    text_color=self.colors['text_secondary'],
-                    anchor="w"
-                ).pack(fill="x", pady=(0, 10))
-                
-                load_macro_btn = ModernButton(
-                    macro_frame,
-                    text="Load",
-                    command=lambda m=macro: self.load_macro(m, saveload_window),
-                    width=60,
-                    height=30,
-                    fg_color=(self.colors['accent_gradient_start'], self.colors['accent_gradient_end']),
-                    hover_color=("#c4b5fd", "#8b5cf6"),
-                    text_color=self.colors['text_primary'],
-                    corner_radius=15,
-                    font=ctk.CTkFont(family="Segoe UI", size=12)
-                )
-                load_macro_btn.pack(side="right", padx=10)
+        # Recent macros: a fixed pool of rows over the full, filterable list
+        recent_frame = GlassFrame(
+            content_frame,
+            fg_color=self.colors['bg_secondary'],
+            corner_radius=15
+        )
+        recent_frame.pack(fill="both", expand=True)
+        
+        recent_header = ctk.CTkFrame(recent_frame, fg_color="transparent")
+        recent_header.pack(fill="x", pady=(15, 10), padx=20)
+        
+        recent_title = ctk.CTkLabel(
+            recent_header,
+            text="RECENT MACROS",
+            font=ctk.CTkFont(family="Segoe UI", size=12, weight="bold"),
+            text_color=self.colors['text_secondary']
+        )
+        recent_title.pack(side="left")
+        
+        search_entry = ctk.CTkEntry(
+            recent_header,
+            placeholder_text="Search...",
+            width=160,
+            height=28,
+            font=ctk.CTkFont(family="Segoe UI", size=12),
+            fg_color=self.colors['bg_tertiary'],
+            border_color=self.colors['border'],
+            text_color=self.colors['text_primary']
+        )
+        search_entry.pack(side="right")
+        
+        macro_list = VirtualMacroList(
+            recent_frame,
+            self.colors,
+            on_load=lambda m: self.load_macro(m, saveload_window)
+        )
+        macro_list.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        search_entry.bind("<KeyRelease>", lambda event: macro_list.set_filter(search_entry.get()))
+        
+        self.populate_macro_list(macro_list, recent_title)
+    
+    def populate_macro_list(self, macro_list, title_label):
+        # Scan off the Tk thread; the result is handed back through a polled queue
+        results = queue.Queue()
+        
+        def scan():
+            try:
+                results.put(self.storage.get_available_macros())
+            except Exception as e:
+                metrics.error('app.macro_list', e)
+                results.put([])
+        
+        def poll():
+            if not macro_list.winfo_exists():
+                return
+            try:
+                macros = results.get_nowait()
+            except queue.Empty:
+                macro_list.after(50, poll)
+                return
+            macro_list.set_items(macros)
+            title_label.configure(text=f"RECENT MACROS ({len(macros)})")
+        
+        macro_list.set_loading()
+        threading.Thread(target=scan, daemon=True).start()
+        macro_list.after(50, poll)
     
     def setup_callbacks(self):
-        self.recorder.set_recording_callback(self.on_recording_changed)
-        self.player.set_playback_callback(self.on_playback_changed)
-        self.player.set_progress_callback(self.on_progress_changed)
+        # Both callbacks fire on worker threads; widgets are only touched from the Tk loop
+        self.recorder.set_recording_callback(lambda is_recording: self.root.after(0, self.on_recording_changed, is_recording))
+        self.player.set_playback_callback(lambda is_playing: self.root.after(0, self.on_playback_changed, is_playing))
+        self.progress_channel = ProgressChannel(
+            self.root.after,
+            self.player.get_progress,
+            self.on_progress_changed,
+            rate=self.settings.get('progress_rate', 30.0)
+        )
     
     def setup_global_hotkeys(self):
         try:
+            from pynput import keyboard
             self.hotkey_listener = keyboard.GlobalHotKeys({
                 '<ctrl>+s': self.emergency_stop,
                 '<ctrl>+<shift>+s': self.emergency_stop
             })
             self.hotkey_listener.start()
         except Exception as e:
-            pass
+            metrics.error('app.hotkeys', e)
     
     def emergency_stop(self):
         try:
@@ -617,7 +1323,7 @@ class MacroAutomationApp:
                 self.root.after(0, self.update_ui_after_emergency_stop)
                 
         except Exception as e:
-            pass
+            metrics.error('app.emergency_stop', e)
     
     def update_ui_after_emergency_stop(self):
         try:
@@ -625,7 +1331,7 @@ class MacroAutomationApp:
             self.record_button.configure(text="⏺  RECORD", state="normal")
             
         except Exception as e:
-            pass
+            metrics.error('app.emergency_stop', e)
     
     def on_recording_changed(self, is_recording: bool):
         if is_recording:
@@ -639,13 +1345,26 @@ class MacroAutomationApp:
         if is_playing:
             self.play_button.configure(text="⏹  STOP")
             self.record_button.configure(state="disabled")
+            self.status_label.configure(text="Playing")
+            self.progress_channel.start()
         else:
             self.play_button.configure(text="▶  PLAY")
             self.record_button.configure(state="normal")
+            self.status_label.configure(text="Ready")
+            self.progress_channel.stop()
     
-    def on_progress_changed(self, current: int, total: int):
-        # Could update button text or add progress indicator if needed
-        pass
+    def on_progress_changed(self, progress):
+        total = progress['total']
+        self.progress_bar.set(progress['current'] / total if total else 0)
+        
+        # A streamed file's total is unknown until its first pass
+        text = f"{progress['current']:,} / {total:,}" if total is not None else f"{progress['current']:,}"
+        if progress['loops'] != 1:
+            loops = progress['loops'] or "∞"
+            text += f"  ·  loop {progress['loop']}/{loops}"
+        if progress['eta'] is not None and progress['is_playing']:
+            text += f"  ·  {progress['eta']:.0f}s left"
+        self.progress_label.configure(text=text)
     
     def on_speed_changed(self, value):
         self.speed_value_label.configure(text=f"{value:.1f}x")
@@ -672,14 +1391,41 @@ class MacroAutomationApp:
     
     def toggle_record(self):
         if self.recorder.is_recording:
-            self.current_sequence = self.recorder.stop_recording()
+            recorded = self.recorder.stop_recording()
+            self.current_sequence = self.optimize_if_enabled(recorded, 'optimize_recordings')
+            if self.last_optimization_stats:
+                self.status_label.configure(text=f"Optimized: {self.last_optimization_stats}")
             if self.current_sequence:
-                self.storage.save_last_sequence(self.current_sequence)
+                # The journal already holds the raw capture. The file is rewritten when journaling is
+                # off, or when optimization changed the sequence: the save is then newer than the
+                # journal, so the optimized sequence is what loads on restart
+                if not self.recorder.journal_path or self.current_sequence is not recorded:
+                    self.storage.save_last_sequence_async(self.current_sequence, self.save_callback(None))
                 self.player.load_sequence(self.current_sequence)
         else:
+            self.recorder.set_journal_path(
+                self.storage.get_journal_path() if self.settings.get('journal_recordings', True) else None
+            )
             self.recorder.start_recording()
     
+    def optimize_if_enabled(self, sequence, setting: str):
+        # Leaves a one-line summary in last_optimization_stats, or None when nothing ran
+        self.last_optimization_stats = None
+        if not sequence or not self.settings.get(setting, False):
+            return sequence
+        
+        # Time saved is estimated from the per-action cost measured during playback, if any
+        optimized, stats = optimize_from_settings(sequence, self.settings, self.measured_action_cost())
+        self.last_optimization_stats = stats.summary()
+        return optimized
+    
+    def loaded_message(self, name: str) -> str:
+        if self.last_optimization_stats:
+            return f"Macro loaded: {name}\nOptimized: {self.last_optimization_stats}"
+        return f"Macro loaded: {name}"
+    
     def load_settings(self):
+        metrics.enable(self.settings.get('metrics_enabled', False))
         try:
             speed = self.settings.get('playback_speed', 1.0)
             loops = self.settings.get('loop_count', 1)
@@ -688,8 +1434,23 @@ class MacroAutomationApp:
             self.loop_entry.insert(0, str(loops))
             
             self.player.set_playback_settings(speed, loops)
-        except:
-            pass
+            self.player.set_timing_options(self.settings.get('late_policy', 'catch_up'))
+            self.storage.set_time_quantum(self.settings.get('timestamp_quantum_us'))
+            self.player.set_gap_options(
+                self.settings.get('idle_threshold', 1.0),
+                self.settings.get('idle_scale', 1.0),
+                self.settings.get('max_gap')
+            )
+            self.player.set_loop_gap(self.settings.get('loop_gap'))
+        except Exception as e:
+            metrics.error('app.settings', e)
+    
+    def load_backend(self):
+        try:
+            self.player.set_backend(create_backend(self.settings.get('input_backend', 'pyautogui')))
+        except Exception as e:
+            # Unknown or unavailable driver: fall back to pyautogui on first playback
+            metrics.error('app.backend', e)
     
     def save_settings(self):
         try:
@@ -698,15 +1459,21 @@ class MacroAutomationApp:
             loop_text = self.loop_entry.get()
             self.settings['loop_count'] = int(loop_text) if loop_text.isdigit() else 1
             
-            self.storage.save_settings(self.settings)
-        except:
-            pass
+            self.storage.save_settings_async(self.settings)
+        except Exception as e:
+            metrics.error('app.settings', e)
     
     def load_last_sequence(self):
+        # Runs on the startup thread; a sequence recorded or loaded meanwhile wins
         last_sequence = self.storage.load_last_sequence()
         if last_sequence:
-            self.current_sequence = last_sequence
-            self.player.load_sequence(last_sequence)
+            self.root.after(0, self.apply_last_sequence, last_sequence)
+    
+    def apply_last_sequence(self, sequence):
+        # On the Tk thread, so the check and both assignments cannot interleave with a user load
+        if not self.current_sequence:
+            self.current_sequence = sequence
+            self.player.load_sequence(sequence)
     
     def save_sequence_as(self):
         if not self.current_sequence:
@@ -716,40 +1483,63 @@ class MacroAutomationApp:
         filename = filedialog.asksaveasfilename(
             title="Save Macro As",
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("JSON files", "*.json"), ("JSON Lines", "*.jsonl"), ("RMouse binary", "*.rmb"), ("All files", "*.*")],
             initialdir=self.storage.default_path
         )
         
         if filename:
             try:
-                self.storage.save_sequence(self.current_sequence, os.path.basename(filename))
-                messagebox.showinfo("Success", f"Macro saved: {os.path.basename(filename)}")
+                # A .gz/.bz2/.xz/.zst suffix in the chosen name overrides the compression setting
+                self.storage.save_sequence_async(
+                    self.current_sequence,
+                    os.path.basename(filename),
+                    compression=self.settings.get('compression'),
+                    callback=self.save_callback(os.path.basename(filename))
+                )
+                self.status_label.configure(text="Saving...")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save: {str(e)}")
     
+    def save_callback(self, name: Optional[str]):
+        # Writer-thread callback that hands the result to the Tk loop
+        return lambda filepath, error: self.root.after(0, self.on_save_finished, name, error)
+    
+    def on_save_finished(self, name: Optional[str], error: Optional[Exception]):
+        # Saves of the last sequence (name None) leave the status alone, it may show optimization stats
+        if name and not self.player.is_playing:
+            self.status_label.configure(text="Ready")
+        if error:
+            messagebox.showerror("Error", f"Failed to save: {str(error)}")
+        elif name:
+            messagebox.showinfo("Success", f"Macro saved: {name}")
+    
     def load_sequence_from_file(self):
         filename = filedialog.askopenfilename(
             title="Load Macro",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("Macro files", "*.json *.jsonl *.rmb *.gz *.bz2 *.xz *.zst"), ("JSON files", "*.json"), ("JSON Lines", "*.jsonl"), ("RMouse binary", "*.rmb"), ("All files", "*.*")],
             initialdir=self.storage.default_path
         )
         
         if filename:
             try:
-                sequence = self.storage.load_sequence(filename)
+                source = self.storage.open_source(filename)
+                sequence = self.optimize_if_enabled(source, 'optimize_on_load')
                 self.current_sequence = sequence
+                self.loaded_from = (filename, sequence) if sequence is source else None
                 self.player.load_sequence(sequence)
-                messagebox.showinfo("Success", f"Macro loaded: {os.path.basename(filename)}")
+                messagebox.showinfo("Success", self.loaded_message(os.path.basename(filename)))
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load: {str(e)}")
     
     def load_macro(self, macro_info, window):
         try:
-            sequence = self.storage.load_sequence(macro_info['filepath'])
+            source = self.storage.open_source(macro_info['filepath'])
+            sequence = self.optimize_if_enabled(source, 'optimize_on_load')
             self.current_sequence = sequence
+            self.loaded_from = (macro_info['filepath'], sequence) if sequence is source else None
             self.player.load_sequence(sequence)
             window.destroy()
-            messagebox.showinfo("Success", f"Macro loaded: {macro_info['name']}")
+            messagebox.showinfo("Success", self.loaded_message(macro_info['name']))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load: {str(e)}")
     
@@ -774,9 +1564,11 @@ class MacroAutomationApp:
                 self.hotkey_listener.stop()
             
             self.save_settings()
+            # Let queued saves reach the disk before the process exits
+            self.storage.flush_writes(timeout=10)
             
         except Exception as e:
-            pass
+            metrics.error('app.cleanup', e)
         finally:
             try:
                 self.root.quit()
@@ -787,13 +1579,12 @@ class MacroAutomationApp:
 
 def main():
     try:
-        app = MacroAutomationApp()
+        app = MacroAutomationApp(profile_startup='--profile-startup' in sys.argv)
         app.run()
     except Exception as e:
         pass
     finally:
         try:
-            import sys
             sys.exit(0)
         except:
             pass
@@ -0,0 +1,141 @@
+"""
+Lightweight runtime metrics: counters, timing histograms and error counts
+"""
+import csv
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+
+
+class Histogram:
+    # Power-of-two microsecond buckets: constant memory, ~2x resolution, cheap to update
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}
+    
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = int(seconds * 1000000).bit_length() if seconds > 0 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+    
+    def percentile(self, fraction: float) -> float:
+        # Upper edge of the bucket holding the percentile, so never an underestimate
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(self.max, (1 << bucket) / 1000000)
+        return self.max
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'min_ms': (self.min or 0.0) * 1000,
+            'p50_ms': self.percentile(0.50) * 1000,
+            'p95_ms': self.percentile(0.95) * 1000,
+            'p99_ms': self.percentile(0.99) * 1000,
+            'max_ms': self.max * 1000,
+            'total_s': self.total
+        }
+
+
+class Metrics:
+    # Hot paths test `metrics.enabled` before reading any clock, so a disabled registry costs
+    # one attribute lookup per call site. Errors are always counted: they are off the hot path
+    # and replace what used to be silently swallowed exceptions.
+    def __init__(self):
+        self.enabled = False
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.last_errors: Dict[str, str] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+    
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+    
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def observe(self, name: str, seconds: float):
+        if self.enabled:
+            with self._lock:
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = Histogram()
+                histogram.add(seconds)
+    
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+    
+    def error(self, name: str, exception: Optional[BaseException] = None):
+        with self._lock:
+            key = 'errors.' + name
+            self.counters[key] = self.counters.get(key, 0) + 1
+            if exception is not None:
+                self.last_errors[name] = f"{type(exception).__name__}: {exception}"
+    
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.last_errors = {}
+            self.started = time.time()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'since': self.started,
+                'counters': dict(sorted(self.counters.items())),
+                'histograms': {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+                'last_errors': dict(self.last_errors)
+            }
+    
+    def rows(self) -> List[Dict[str, Any]]:
+        # Flat form shared by the CSV export and the diagnostics panel
+        snapshot = self.snapshot()
+        rows = [{'metric': name, 'kind': 'counter', 'count': value}
+                for name, value in snapshot['counters'].items()]
+        for name, values in snapshot['histograms'].items():
+            rows.append(dict({'metric': name, 'kind': 'histogram'}, **values))
+        return rows
+    
+    def export(self, filepath: str):
+        # .csv gets one row per metric; anything else is written as JSON
+        if filepath.endswith('.csv'):
+            fields = ['metric', 'kind', 'count', 'mean_ms', 'min_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'total_s']
+            with open(filepath, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(self.rows())
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, indent=2)
+
+
+metrics = Metrics() 
\ No newline at end of file
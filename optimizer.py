@@ -0,0 +1,153 @@
+"""
+Post-processing passes that thin out recorded mouse movement
+"""
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from action_buffer import ActionBuffer, ActionView
+
+
+# Seconds one input call is assumed to take when no playback has measured it
+DEFAULT_ACTION_COST = 0.001
+
+
+class OptimizationStats:
+    def __init__(self):
+        self.original_actions = 0
+        self.optimized_actions = 0
+        self.original_moves = 0
+        self.optimized_moves = 0
+        self.action_cost = 0.0
+    
+    @property
+    def removed_actions(self) -> int:
+        return self.original_actions - self.optimized_actions
+    
+    @property
+    def time_saved(self) -> float:
+        # Every dropped move is one less input call per loop
+        return self.removed_actions * self.action_cost
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'original_actions': self.original_actions,
+            'optimized_actions': self.optimized_actions,
+            'original_moves': self.original_moves,
+            'optimized_moves': self.optimized_moves,
+            'removed_actions': self.removed_actions,
+            'reduction': self.removed_actions / self.original_actions if self.original_actions else 0.0,
+            'time_saved_per_loop': self.time_saved
+        }
+    
+    def summary(self) -> str:
+        return (f"{self.removed_actions} of {self.original_actions} actions removed, "
+                f"~{self.time_saved * 1000:.1f} ms saved per loop")
+
+
+def _point_line_distance(point, start, end) -> float:
+    (px, py), (sx, sy), (ex, ey) = point, start, end
+    dx, dy = ex - sx, ey - sy
+    if dx == 0 and dy == 0:
+        return ((px - sx) ** 2 + (py - sy) ** 2) ** 0.5
+    return abs(dy * px - dx * py + ex * sy - ey * sx) / (dx * dx + dy * dy) ** 0.5
+
+
+def simplify_path(moves: List[Dict[str, Any]], tolerance: float) -> List[Dict[str, Any]]:
+    # Ramer-Douglas-Peucker, iterative so long runs cannot hit the recursion limit
+    if tolerance <= 0 or len(moves) < 3:
+        return moves
+    
+    points = [(move['x'], move['y']) for move in moves]
+    keep = [False] * len(moves)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(moves) - 1)]
+    
+    while stack:
+        first, last = stack.pop()
+        max_distance = 0.0
+        index = first
+        for i in range(first + 1, last):
+            distance = _point_line_distance(points[i], points[first], points[last])
+            if distance > max_distance:
+                max_distance = distance
+                index = i
+        if max_distance > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    
+    return [move for move, kept in zip(moves, keep) if kept]
+
+
+def coalesce_moves(moves: List[Dict[str, Any]], bucket: float) -> List[Dict[str, Any]]:
+    # Keep the last move of each time bucket, plus the very first move of the run
+    if bucket <= 0 or len(moves) < 2:
+        return moves
+    
+    result = [moves[0]]
+    for i in range(1, len(moves)):
+        current = int(moves[i].get('timestamp', 0) / bucket)
+        is_last = i == len(moves) - 1
+        if is_last or int(moves[i + 1].get('timestamp', 0) / bucket) != current:
+            result.append(moves[i])
+    return result
+
+
+def _flush_run(run, tolerance, bucket):
+    if not run:
+        return run
+    return simplify_path(coalesce_moves(run, bucket), tolerance)
+
+
+def iter_optimized(actions: Iterable[Dict[str, Any]], dedupe: bool = True, tolerance: float = 0.0,
+                   bucket: float = 0.0, stats: OptimizationStats = None) -> Iterator[Dict[str, Any]]:
+    # Only runs of consecutive mouse_move events are touched; every other action passes through as-is
+    stats = stats if stats is not None else OptimizationStats()
+    run: List[Dict[str, Any]] = []
+    position = None
+    
+    for action in actions:
+        stats.original_actions += 1
+        if action.get('type') == 'mouse_move':
+            stats.original_moves += 1
+            point = (action.get('x', 0), action.get('y', 0))
+            if dedupe and point == position:
+                continue
+            position = point
+            run.append(action)
+            continue
+        
+        for move in _flush_run(run, tolerance, bucket):
+            stats.optimized_actions += 1
+            stats.optimized_moves += 1
+            yield move
+        run = []
+        
+        if 'x' in action and 'y' in action:
+            position = (action['x'], action['y'])
+        stats.optimized_actions += 1
+        yield action
+    
+    for move in _flush_run(run, tolerance, bucket):
+        stats.optimized_actions += 1
+        stats.optimized_moves += 1
+        yield move
+
+
+def optimize_sequence(actions: Iterable[Dict[str, Any]], dedupe: bool = True, tolerance: float = 0.0,
+                      bucket: float = 0.0, action_cost: float = DEFAULT_ACTION_COST) -> Tuple[ActionView, OptimizationStats]:
+    stats = OptimizationStats()
+    stats.action_cost = action_cost
+    buffer = ActionBuffer.from_actions(iter_optimized(actions, dedupe, tolerance, bucket, stats))
+    return buffer.view(), stats
+
+
+def optimize_from_settings(actions: Iterable[Dict[str, Any]], settings: Dict[str, Any],
+                           action_cost: Optional[float] = None) -> Tuple[ActionView, OptimizationStats]:
+    # action_cost: measured seconds per input call, when a playback has measured one
+    return optimize_sequence(
+        actions,
+        dedupe=settings.get('dedupe_moves', True),
+        tolerance=settings.get('path_tolerance', 0.0),
+        bucket=settings.get('move_bucket', 0.0),
+        action_cost=action_cost if action_cost is not None else DEFAULT_ACTION_COST
+    ) 
\ No newline at end of file
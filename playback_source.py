@@ -0,0 +1,280 @@
+"""
+Playback sources: feed MacroPlayer without materializing whole macros
+"""
+import json
+import mmap
+import os
+from array import array
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional
+
+import binary_format
+import compressed_io
+import timeline
+from action_buffer import ActionView, build_action, key_name
+
+
+# A source can be iterated once per loop and always yields action dicts in order.
+class PlaybackSource:
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+    
+    def __len__(self) -> int:
+        raise NotImplementedError
+    
+    def known_length(self) -> Optional[int]:
+        # Action count when it is available without reading the source, else None
+        return len(self)
+    
+    def __bool__(self) -> bool:
+        # Truth tests run on the UI thread and must not fall back to a full-file __len__
+        length = self.known_length()
+        if length is not None:
+            return length > 0
+        for _ in self:
+            return True
+        return False
+    
+    @property
+    def duration(self) -> float:
+        raise NotImplementedError
+    
+    def timestamps(self) -> Iterator[float]:
+        # Sources that can skip building action dicts override this
+        for action in self:
+            yield action.get('timestamp', 0)
+
+
+class SequenceSource(PlaybackSource):
+    def __init__(self, sequence: List[Dict[str, Any]]):
+        self.sequence = sequence
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.sequence)
+    
+    def __len__(self) -> int:
+        return len(self.sequence)
+    
+    @property
+    def duration(self) -> float:
+        if not self.sequence:
+            return 0
+        return self.sequence[-1].get('timestamp', 0)
+    
+    def timestamps(self) -> Iterator[float]:
+        if isinstance(self.sequence, ActionView):
+            return iter(self.sequence.buffer.timestamps[:len(self.sequence)])
+        return super().timestamps()
+
+
+class GeneratorSource(PlaybackSource):
+    def __init__(self, factory: Callable[[], Iterable[Dict[str, Any]]],
+                 length: Optional[int] = None, duration: Optional[float] = None):
+        self.factory = factory
+        self._length = length
+        self._duration = duration
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.factory())
+    
+    def _scan(self):
+        # One streaming pass when the caller did not provide length/duration
+        length = 0
+        duration = 0
+        for action in self.factory():
+            length += 1
+            duration = action.get('timestamp', 0)
+        self._length = length
+        if self._duration is None:
+            self._duration = duration
+    
+    def __len__(self) -> int:
+        if self._length is None:
+            self._scan()
+        return self._length
+    
+    def known_length(self) -> Optional[int]:
+        return self._length
+    
+    @property
+    def duration(self) -> float:
+        if self._duration is None:
+            self._scan()
+        return self._duration
+
+
+class BinaryFileSource(PlaybackSource):
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        with open(filepath, 'rb') as f:
+            self.count, self.key_names, self.data_offset = binary_format.read_header(f)
+        self._duration = None
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    @property
+    def duration(self) -> float:
+        if self._duration is None:
+            # Sum the delta column in chunks to keep memory flat
+            total = 0
+            remaining = self.count
+            with open(self.filepath, 'rb') as f:
+                f.seek(self.data_offset)
+                while remaining:
+                    chunk = min(remaining, 65536)
+                    total += sum(binary_format.read_column(f, binary_format.DT_TYPECODE, chunk))
+                    remaining -= chunk
+            self._duration = total / 1000000
+        return self._duration
+    
+    def timestamps(self) -> Iterator[float]:
+        elapsed = 0
+        remaining = self.count
+        with open(self.filepath, 'rb') as f:
+            f.seek(self.data_offset)
+            while remaining:
+                chunk = min(remaining, 65536)
+                for delta in binary_format.read_column(f, binary_format.DT_TYPECODE, chunk):
+                    elapsed += delta
+                    yield elapsed / 1000000
+                remaining -= chunk
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not self.count:
+            return
+        
+        if not binary_format.NATIVE_LAYOUT:
+            # memoryview casts are native-endian; fall back to a full decode
+            yield from binary_format.load(self.filepath).view()
+            return
+        
+        with open(self.filepath, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        view = memoryview(mapped)
+        columns = {}
+        try:
+            for attribute, typecode, offset in binary_format.column_offsets(self.count, self.data_offset):
+                size = array(typecode).itemsize * self.count
+                columns[attribute] = view[offset:offset + size].cast(typecode)
+            
+            deltas, types, buttons = columns['dt'], columns['types'], columns['buttons']
+            xs, ys, dxs, dys, keys = columns['xs'], columns['ys'], columns['dxs'], columns['dys'], columns['keys']
+            key_names = self.key_names
+            
+            elapsed = 0
+            for i in range(self.count):
+                elapsed += deltas[i]
+                yield build_action(
+                    types[i], xs[i], ys[i], buttons[i], dxs[i], dys[i],
+                    key_name(keys[i], key_names),
+                    elapsed / 1000000
+                )
+        finally:
+            # The map cannot be closed while casts of it are still alive
+            for column in columns.values():
+                column.release()
+            view.release()
+            mapped.close()
+
+
+class JsonLinesSource(PlaybackSource):
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._header = None
+        self._length = None
+        self._duration = None
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # Compressed files are decompressed line by line as they are played
+        with compressed_io.open_text(self.filepath) as f:
+            delta_encoded = False
+            elapsed_us = 0
+            count = 0
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    action = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from an interrupted write
+                    continue
+                if 'type' not in action:
+                    delta_encoded = delta_encoded or timeline.is_delta_encoded(action)
+                    continue
+                if delta_encoded:
+                    elapsed_us = timeline.decode_action(action, elapsed_us)
+                count += 1
+                yield action
+            # A full pass is as good as counting
+            if self._length is None:
+                self._length = count
+    
+    def _read_header(self) -> Dict[str, Any]:
+        if self._header is None:
+            with compressed_io.open_text(self.filepath) as f:
+                try:
+                    header = json.loads(f.readline())
+                except ValueError:
+                    header = None
+            self._header = header if isinstance(header, dict) and 'type' not in header else {}
+        return self._header
+    
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = self.known_length()
+        if self._length is None:
+            # Count action lines without decoding them
+            with compressed_io.open_compressed(self.filepath) as f:
+                self._length = sum(1 for line in f if b'"type"' in line)
+        return self._length
+    
+    def known_length(self) -> Optional[int]:
+        # Saved files carry the count in their header; journals only know it once read
+        if self._length is not None:
+            return self._length
+        return self._read_header().get('total_actions')
+    
+    @property
+    def duration(self) -> float:
+        if self._duration is None:
+            self._duration = self._read_last_timestamp()
+        return self._duration
+    
+    def _is_delta_encoded(self) -> bool:
+        return timeline.is_delta_encoded(self._read_header())
+    
+    def _read_last_timestamp(self) -> float:
+        if compressed_io.detect_codec(self.filepath) or self._is_delta_encoded():
+            # No random access into a compressed stream, and deltas only add up from the start
+            timestamp = 0
+            for action in self:
+                timestamp = action.get('timestamp', timestamp)
+            return timestamp
+        
+        # Only read the tail of the file, not the whole macro
+        with open(self.filepath, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            chunk = 4096
+            while True:
+                start = max(0, end - chunk)
+                f.seek(start)
+                lines = f.read(end - start).splitlines()
+                for line in reversed(lines[1:] if start > 0 else lines):
+                    try:
+                        action = json.loads(line)
+                    except ValueError:
+                        continue
+                    if 'type' in action:
+                        return action.get('timestamp', 0)
+                if start == 0:
+                    return 0
+                chunk *= 2
+
+
+def as_source(sequence) -> PlaybackSource:
+    if isinstance(sequence, PlaybackSource):
+        return sequence
+    return SequenceSource(sequence if sequence is not None else []) 
\ No newline at end of file
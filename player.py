@@ -4,15 +4,23 @@ Macro playback module
 import time
 import threading
 from typing import List, Dict, Any, Callable, Optional
-import pyautogui
-from pynput.keyboard import Key, KeyCode
-from pynput import keyboard
+
+import keymap
+from backends import InputBackend, FailSafeTriggered, create_backend
+from action_program import COMPILE_LIMIT, compile_sequence, iter_records
+from playback_source import PlaybackSource, SequenceSource, as_source
+from scheduler import PlaybackScheduler
+from timeline import GapPolicy, timing_profile
+from metrics import metrics
+
+
+DEFAULT_LOOP_GAP = 0.5
 
 
 class MacroPlayer:
-    def __init__(self):
+    def __init__(self, backend: Optional[InputBackend] = None):
         self.is_playing = False
-        self.current_sequence: List[Dict[str, Any]] = []
+        self.current_sequence: PlaybackSource = as_source([])
         self.playback_speed = 1.0
         self.loop_count = 1
         self.current_loop = 0
@@ -20,18 +28,62 @@ class MacroPlayer:
         self.stop_requested = False
         self.on_playback_changed: Optional[Callable[[bool], None]] = None
         self.on_progress_changed: Optional[Callable[[int, int], None]] = None
-        
-        # PyAutoGUI safety settings
-        pyautogui.FAILSAFE = True
-        pyautogui.PAUSE = 0.01
+        # Written by the playback thread, sampled by whoever displays progress
+        self.position = 0
+        self.position_total = 0
+        self.late_policy = 'catch_up'
+        self.spin_threshold = 0.001
+        self.last_report: Dict[str, Any] = {}
+        self.gap_policy = GapPolicy()
+        # None: the pre-scheduler behaviour, 0.5 s between finite loops and none for infinite ones
+        self.loop_gap: Optional[float] = None
+        self._profile = None
+        # Created on first playback so importing the player needs no display
+        self.backend = backend
+        self.program = None
     
     def load_sequence(self, sequence: List[Dict[str, Any]]):
-        self.current_sequence = sequence.copy()
+        # Wrap rather than copy: streaming sources never materialize the macro. Compiling is
+        # left to the playback thread, so loading costs the same whatever the macro's size.
+        self.current_sequence = as_source(sequence)
+        self.program = None
+        self._profile = None
+    
+    def _can_compile(self) -> bool:
+        source = self.current_sequence
+        return isinstance(source, SequenceSource) and len(source) <= COMPILE_LIMIT
+    
+    def _compile(self):
+        # In-memory sequences are compiled once and the program is reused for every loop
+        self.program = compile_sequence(self.current_sequence, self.backend) if self._can_compile() else None
     
     def set_playback_settings(self, speed: float = 1.0, loops: int = 1):
         self.playback_speed = max(0.1, min(15.0, speed))
         self.loop_count = max(0, loops)
     
+    def set_backend(self, backend: InputBackend):
+        # Records hold the old backend's bound methods; recompiled on the next playback
+        self.backend = backend
+        self.program = None
+    
+    def set_timing_options(self, late_policy: str = 'catch_up', spin_threshold: float = 0.001):
+        self.late_policy = late_policy
+        self.spin_threshold = max(0.0, spin_threshold)
+    
+    def set_gap_options(self, idle_threshold: float = 1.0, idle_scale: float = 1.0, max_gap: Optional[float] = None):
+        # Applied on the recorded timeline, before playback_speed; the defaults play every gap as recorded
+        self.gap_policy = GapPolicy(idle_threshold, idle_scale, max_gap)
+        self._profile = None
+    
+    def set_loop_gap(self, gap: Optional[float] = None):
+        # Pause between two loops, in seconds; 0 starts the next loop right on the last action's deadline
+        self.loop_gap = max(0.0, gap) if gap is not None else None
+    
+    def effective_loop_gap(self) -> float:
+        if self.loop_gap is not None:
+            return self.loop_gap
+        return DEFAULT_LOOP_GAP if self.loop_count > 0 else 0.0
+    
     def play(self) -> bool:
         if self.is_playing or not self.current_sequence:
             return False
@@ -39,6 +91,7 @@ class MacroPlayer:
         self.is_playing = True
         self.stop_requested = False
         self.current_loop = 0
+        self.position = 0
         
         self.play_thread = threading.Thread(target=self._play_sequence, daemon=True)
         self.play_thread.start()
@@ -54,53 +107,116 @@ class MacroPlayer:
         
         self.stop_requested = True
     
+    def _create_scheduler(self) -> PlaybackScheduler:
+        return PlaybackScheduler(
+            self.playback_speed,
+            spin_threshold=self.spin_threshold,
+            late_policy=self.late_policy,
+            should_stop=lambda: self.stop_requested
+        )
+    
+    def play_once(self) -> Dict[str, Any]:
+        # One pass on the caller's thread, without loops or playback callbacks; returns the
+        # playback report. For benchmarks and tools that time the player directly.
+        scheduler = self._create_scheduler()
+        scheduler.start()
+        try:
+            self._execute_actions(scheduler)
+        finally:
+            self.last_report = scheduler.finish().to_dict()
+            self.stop_requested = False
+        return self.get_playback_report()
+    
     def _play_sequence(self):
+        # All loops run on one scheduler, so every deadline sits on a single absolute timeline
+        scheduler = self._create_scheduler()
         try:
             loops_to_do = self.loop_count if self.loop_count > 0 else float('inf')
+            loop_gap = self.effective_loop_gap()
+            scheduler.start()
             
             while self.current_loop < loops_to_do and not self.stop_requested:
                 self.current_loop += 1
                 
-                if not self._execute_actions():
+                if not self._execute_actions(scheduler):
                     break
                 
-                # Pause between loops
-                if self.loop_count > 1 and self.current_loop < loops_to_do:
-                    time.sleep(0.5)
+                if self.current_loop < loops_to_do:
+                    scheduler.next_loop(loop_gap)
             
         except Exception as e:
-            pass
+            metrics.error('player.loop', e)
         finally:
+            self.last_report = scheduler.finish().to_dict()
+            if metrics.enabled:
+                metrics.count('player.actions', self.last_report['actions'])
+                metrics.count('player.skipped', self.last_report['skipped'])
+                metrics.count('player.coalesced', self.last_report['coalesced'])
             self._cleanup_playback()
     
-    def _execute_actions(self) -> bool:
+    def _execute_actions(self, scheduler: PlaybackScheduler) -> bool:
         if not self.current_sequence:
             return False
         
-        last_timestamp = 0
+        if self.backend is None:
+            self.backend = create_backend()
+        if self.program is None and self._can_compile():
+            self._compile()
+        
+        if self.program is not None:
+            records = self.program
+            total = len(self.program)
+        else:
+            # Streaming sources are compiled action by action as they are read. Their length
+            # may only be known after the first pass; progress runs without a total until then.
+            records = iter_records(self.current_sequence, self.backend)
+            total = self.current_sequence.known_length()
+        if self.gap_policy.enabled:
+            records = self.gap_policy.apply(records)
+        if self.backend.coalesce_moves:
+            records = scheduler.coalesce_moves(records)
+        self.position = 0
+        self.position_total = total
+        
+        # Read once per pass: with metrics off the hot loop never touches the clock
+        timed = metrics.enabled
         
-        for i, action in enumerate(self.current_sequence):
+        for i, record in enumerate(records):
             if self.stop_requested:
                 return False
+            if record is None:
+                continue
             
-            # Handle timing between actions
-            current_timestamp = action.get('timestamp', 0)
-            if i > 0:
-                delay = (current_timestamp - last_timestamp) / self.playback_speed
-                if delay > 0:
-                    time.sleep(max(0.001, delay))
+            func, args, offset, skippable = record
             
-            last_timestamp = current_timestamp
+            # Wait for the action's absolute deadline; late mouse moves may be skipped
+            ready = scheduler.wait_for(offset, skippable)
+            if ready is False:
+                return False
             
             try:
-                self._execute_action(action)
-                
-                if self.on_progress_changed:
-                    self.on_progress_changed(i + 1, len(self.current_sequence))
-                    
+                if ready:
+                    if timed:
+                        started = time.perf_counter()
+                        func(*args)
+                        metrics.observe('player.action', time.perf_counter() - started)
+                    else:
+                        func(*args)
+                self.position = i + 1
+            except FailSafeTriggered:
+                self.stop_requested = True
+                return False
             except Exception as e:
+                metrics.error('player.action', e)
                 continue
         
+        if total is None:
+            total = self.position_total = self.current_sequence.known_length() or self.position
+        
+        # Per-pass notification only; per-action progress is polled through get_progress()
+        if self.on_progress_changed:
+            self.on_progress_changed(self.position, total)
+        
         return True
     
     def _execute_action(self, action: Dict[str, Any]):
@@ -108,54 +224,47 @@ class MacroPlayer:
         
         if action_type == 'mouse_move':
             x, y = action.get('x', 0), action.get('y', 0)
-            pyautogui.moveTo(x, y)
+            self.backend.move_to(x, y)
             
         elif action_type == 'mouse_press':
             x, y = action.get('x', 0), action.get('y', 0)
             button = action.get('button', 'left')
-            pyautogui.mouseDown(x, y, button=button)
+            self.backend.mouse_down(x, y, button)
             
         elif action_type == 'mouse_release':
             x, y = action.get('x', 0), action.get('y', 0)
             button = action.get('button', 'left')
-            pyautogui.mouseUp(x, y, button=button)
+            self.backend.mouse_up(x, y, button)
             
         elif action_type == 'mouse_scroll':
             x, y = action.get('x', 0), action.get('y', 0)
-            dy = action.get('dy', 0)
-            pyautogui.scroll(dy, x=x, y=y)
+            self.backend.scroll(x, y, action.get('dx', 0), action.get('dy', 0))
             
-        elif action_type == 'key_press':
-            key = action.get('key', '')
-            self._press_key(key)
-            
-        elif action_type == 'key_release':
-            key = action.get('key', '')
-            self._release_key(key)
+        elif action_type == 'key_press' or action_type == 'key_release':
+            # Names without a keymap id cannot be injected
+            key = keymap.key_id(action.get('key', ''))
+            if key is None:
+                return
+            if action_type == 'key_press':
+                self._press_key(key)
+            else:
+                self._release_key(key)
     
-    def _press_key(self, key_str: str):
+    def _press_key(self, key: int):
         try:
-            if key_str.startswith('Key.'):
-                key_name = key_str[4:].lower()
-                if hasattr(pyautogui, key_name):
-                    pyautogui.keyDown(key_name)
-            else:
-                if key_str and len(key_str) == 1:
-                    pyautogui.keyDown(key_str)
+            self.backend.key_down(key)
+        except FailSafeTriggered:
+            raise
         except Exception as e:
-            pass
+            metrics.error('player.key', e)
     
-    def _release_key(self, key_str: str):
+    def _release_key(self, key: int):
         try:
-            if key_str.startswith('Key.'):
-                key_name = key_str[4:].lower()
-                if hasattr(pyautogui, key_name):
-                    pyautogui.keyUp(key_name)
-            else:
-                if key_str and len(key_str) == 1:
-                    pyautogui.keyUp(key_str)
+            self.backend.key_up(key)
+        except FailSafeTriggered:
+            raise
         except Exception as e:
-            pass
+            metrics.error('player.key', e)
     
     def _cleanup_playback(self):
         self.is_playing = False
@@ -165,25 +274,47 @@ class MacroPlayer:
             self.on_playback_changed(False)
     
     def is_sequence_loaded(self) -> bool:
-        return len(self.current_sequence) > 0
+        return bool(self.current_sequence)
     
     def get_sequence_info(self) -> Dict[str, Any]:
         if not self.current_sequence:
             return {'loaded': False}
         
-        total_time = 0
-        if self.current_sequence:
-            total_time = self.current_sequence[-1].get('timestamp', 0)
-        
         return {
             'loaded': True,
             'total_actions': len(self.current_sequence),
-            'duration': total_time,
+            'duration': self.current_sequence.duration,
             'current_loop': self.current_loop,
             'total_loops': self.loop_count,
+            'is_playing': self.is_playing,
+            'timing': self.get_timing_profile()
+        }
+    
+    def get_timing_profile(self) -> Dict[str, Any]:
+        # Computed once per sequence and gap setting; loop_time is what one loop takes at the current speed
+        if self._profile is None:
+            self._profile = timing_profile(self.current_sequence.timestamps(), self.gap_policy)
+            self._profile.update(self.gap_policy.to_dict())
+        profile = dict(self._profile)
+        profile['loop_time'] = profile['adjusted_duration'] / self.playback_speed
+        # Loops start on fixed deadlines, so the period is exact rather than an average
+        profile['loop_gap'] = self.effective_loop_gap()
+        profile['loop_period'] = profile['loop_time'] + profile['loop_gap']
+        profile['loops_per_hour'] = 3600 / profile['loop_period'] if profile['loop_period'] else None
+        return profile
+    
+    def get_progress(self) -> Dict[str, Any]:
+        return {
+            'current': self.position,
+            'total': self.position_total,
+            'loop': self.current_loop,
+            'loops': self.loop_count,
             'is_playing': self.is_playing
         }
     
+    def get_playback_report(self) -> Dict[str, Any]:
+        return dict(self.last_report)
+    
     def set_playback_callback(self, callback: Callable[[bool], None]):
         self.on_playback_changed = callback
     
@@ -0,0 +1,68 @@
+"""
+Coalesced playback progress, sampled on the UI loop
+"""
+import time
+from typing import Dict, Any, Callable, Optional
+
+from metrics import metrics
+
+
+class ProgressChannel:
+    # The playback thread never calls into the UI: it only updates plain attributes that
+    # `sample` reads. The channel polls at `rate` Hz through `schedule` (e.g. root.after), so
+    # the callback always runs on the UI thread and at most `rate` times per second.
+    def __init__(self, schedule: Callable[[int, Callable], Any], sample: Callable[[], Dict[str, Any]],
+                 callback: Callable[[Dict[str, Any]], None], rate: float = 30.0):
+        self.schedule = schedule
+        self.sample = sample
+        self.callback = callback
+        self.interval_ms = max(1, int(1000 / max(0.1, rate)))
+        self.active = False
+        self.started_at = 0.0
+        self._last = None
+        self._scheduled = False
+    
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._last = None
+        self.active = True
+        if not self._scheduled:
+            self._scheduled = True
+            self.schedule(self.interval_ms, self._tick)
+    
+    def stop(self):
+        # The pending tick delivers the final state and then stops rescheduling
+        self.active = False
+    
+    def _tick(self):
+        self._scheduled = False
+        try:
+            self._deliver()
+        except Exception as e:
+            metrics.error('progress.callback', e)
+        if self.active:
+            self._scheduled = True
+            self.schedule(self.interval_ms, self._tick)
+    
+    def _deliver(self):
+        progress = self.sample()
+        key = (progress['current'], progress['total'], progress['loop'])
+        if key == self._last:
+            return
+        self._last = key
+        
+        progress['elapsed'] = time.perf_counter() - self.started_at
+        progress['eta'] = estimate_eta(progress)
+        self.callback(progress)
+
+
+def estimate_eta(progress: Dict[str, Any]) -> Optional[float]:
+    # Extrapolates from the rate so far; None while unknown or for infinite loops
+    total = progress['total']
+    loops = progress['loops']
+    if not total or not loops:
+        return None
+    done = (progress['loop'] - 1) * total + progress['current']
+    if done <= 0:
+        return None
+    return progress['elapsed'] * (loops * total - done) / done 
\ No newline at end of file
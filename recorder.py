@@ -3,29 +3,47 @@ Mouse and keyboard action recording module
 """
 import time
 import threading
-from typing import List, Dict, Any, Callable, Optional
-from pynput import mouse, keyboard
-from pynput.mouse import Button
-from pynput.keyboard import Key
+from typing import Dict, Any, Callable, Optional
+
+from action_buffer import (
+    ActionBuffer, ActionView, MOUSE_MOVE, MOUSE_PRESS, MOUSE_RELEASE, MOUSE_SCROLL,
+    KEY_PRESS, KEY_RELEASE, BUTTON_CODES
+)
+import keymap
+from ingest import EventQueue
+from journal import RecordingJournal
+from metrics import metrics
 
 
 class MacroRecorder:
     def __init__(self):
         self.is_recording = False
-        self.actions: List[Dict[str, Any]] = []
+        self.actions = ActionBuffer()
         self.start_time = 0
         self.mouse_listener = None
         self.keyboard_listener = None
         self.on_recording_changed: Optional[Callable[[bool], None]] = None
+        # When set, events are streamed to this append-only file while recording
+        self.journal_path: Optional[str] = None
+        self.journal: Optional[RecordingJournal] = None
+        # Hook callbacks only enqueue raw tuples; a consumer thread fills the buffer
+        self.queue = EventQueue()
+        self.queue_capacity = 65536
+        self.consumer_thread = None
+        self._consumer_stop = threading.Event()
         
     def start_recording(self) -> bool:
         if self.is_recording:
             return False
         
-        self.actions.clear()
+        # Fresh buffer so views handed out for the previous capture stay valid
+        self.actions = ActionBuffer()
         self.is_recording = True
-        self.start_time = time.time()
+        # Monotonic: wall-clock adjustments (NTP, DST) during a capture cannot skew the timeline
+        self.start_time = time.perf_counter()
         
+        self._start_journal()
+        self._start_consumer()
         self._start_mouse_listener()
         self._start_keyboard_listener()
         
@@ -34,9 +52,9 @@ class MacroRecorder:
         
         return True
     
-    def stop_recording(self) -> List[Dict[str, Any]]:
+    def stop_recording(self) -> ActionView:
         if not self.is_recording:
-            return self.actions
+            return self.actions.view()
         
         self.is_recording = False
         
@@ -48,13 +66,90 @@ class MacroRecorder:
             self.keyboard_listener.stop()
             self.keyboard_listener = None
         
+        self._stop_consumer()
+        self._stop_journal()
+        
         if self.on_recording_changed:
             self.on_recording_changed(False)
         
-        return self.actions.copy()
+        return self.actions.view()
+    
+    def _start_consumer(self):
+        self.queue = EventQueue(self.queue_capacity)
+        self._consumer_stop.clear()
+        self.consumer_thread = threading.Thread(target=self._consume, daemon=True)
+        self.consumer_thread.start()
+    
+    def _stop_consumer(self):
+        # Listeners are already stopped, so the consumer drains what is left and exits
+        self._consumer_stop.set()
+        if self.consumer_thread:
+            self.consumer_thread.join()
+            self.consumer_thread = None
+    
+    def _consume(self):
+        while True:
+            if not self.queue.drain(self._ingest, self._get_timestamp):
+                if self._consumer_stop.is_set():
+                    break
+                time.sleep(0.002)
+    
+    def _ingest(self, event: tuple):
+        type_code = event[0]
+        
+        if type_code == MOUSE_MOVE:
+            _, x, y, timestamp = event
+            self.actions.append(MOUSE_MOVE, x, y, timestamp=timestamp)
+            
+        elif type_code == MOUSE_PRESS or type_code == MOUSE_RELEASE:
+            _, x, y, button, timestamp = event
+            button_name = getattr(button, 'name', '')
+            if button_name != 'left' and button_name != 'right':
+                button_name = 'middle'
+            self.actions.append(type_code, x, y, BUTTON_CODES[button_name], timestamp=timestamp)
+            
+        elif type_code == MOUSE_SCROLL:
+            _, x, y, dx, dy, timestamp = event
+            self.actions.append(MOUSE_SCROLL, x, y, dx=dx, dy=dy, timestamp=timestamp)
+            
+        else:
+            _, key, timestamp = event
+            key_id = keymap.from_pynput(key)
+            if key_id is not None:
+                self.actions.append(type_code, key=key_id, timestamp=timestamp)
+            else:
+                self.actions.append_key(type_code, str(key), timestamp)
+    
+    def get_ingest_stats(self) -> Dict[str, Any]:
+        return self.queue.stats()
+    
+    def _start_journal(self):
+        if not self.journal_path:
+            return
+        try:
+            self.journal = RecordingJournal(self.journal_path, self.actions)
+            self.journal.start()
+        except Exception as e:
+            metrics.error('recorder.journal', e)
+            self.journal = None
+    
+    def _stop_journal(self):
+        if not self.journal:
+            return
+        try:
+            self.journal.close()
+        except Exception as e:
+            metrics.error('recorder.journal', e)
+        finally:
+            self.journal = None
+    
+    def set_journal_path(self, path: Optional[str]):
+        self.journal_path = path
     
     def _start_mouse_listener(self):
         try:
+            # Imported on first use: loading pynput hooks the display, which startup should not wait for
+            from pynput import mouse
             self.mouse_listener = mouse.Listener(
                 on_move=self._on_mouse_move,
                 on_click=self._on_mouse_click,
@@ -62,100 +157,64 @@ class MacroRecorder:
             )
             self.mouse_listener.start()
         except Exception as e:
-            pass
+            metrics.error('recorder.mouse_listener', e)
     
     def _start_keyboard_listener(self):
         try:
+            from pynput import keyboard
             self.keyboard_listener = keyboard.Listener(
                 on_press=self._on_key_press,
                 on_release=self._on_key_release
             )
             self.keyboard_listener.start()
         except Exception as e:
-            pass
+            metrics.error('recorder.keyboard_listener', e)
     
     def _get_timestamp(self) -> float:
-        return time.time() - self.start_time
+        return time.perf_counter() - self.start_time
     
     def _on_mouse_move(self, x: int, y: int):
         if not self.is_recording:
             return
         
-        action = {
-            'type': 'mouse_move',
-            'x': x,
-            'y': y,
-            'timestamp': self._get_timestamp()
-        }
-        self.actions.append(action)
+        # One clock read is both the event time and the start of the callback-cost measurement
+        entered = time.perf_counter()
+        self.queue.push((MOUSE_MOVE, x, y, entered - self.start_time), entered)
     
-    def _on_mouse_click(self, x: int, y: int, button: Button, pressed: bool):
+    def _on_mouse_click(self, x: int, y: int, button, pressed: bool):
         if not self.is_recording:
             return
         
-        button_name = 'left' if button == Button.left else 'right' if button == Button.right else 'middle'
-        action_type = 'mouse_press' if pressed else 'mouse_release'
-        
-        action = {
-            'type': action_type,
-            'x': x,
-            'y': y,
-            'button': button_name,
-            'timestamp': self._get_timestamp()
-        }
-        self.actions.append(action)
+        entered = time.perf_counter()
+        action_type = MOUSE_PRESS if pressed else MOUSE_RELEASE
+        self.queue.push((action_type, x, y, button, entered - self.start_time), entered)
     
     def _on_mouse_scroll(self, x: int, y: int, dx: int, dy: int):
         if not self.is_recording:
             return
         
-        action = {
-            'type': 'mouse_scroll',
-            'x': x,
-            'y': y,
-            'dx': dx,
-            'dy': dy,
-            'timestamp': self._get_timestamp()
-        }
-        self.actions.append(action)
+        entered = time.perf_counter()
+        self.queue.push((MOUSE_SCROLL, x, y, dx, dy, entered - self.start_time), entered)
     
     def _on_key_press(self, key):
         if not self.is_recording:
             return
         
-        try:
-            key_name = key.char if hasattr(key, 'char') and key.char else str(key)
-        except AttributeError:
-            key_name = str(key)
-        
-        action = {
-            'type': 'key_press',
-            'key': key_name,
-            'timestamp': self._get_timestamp()
-        }
-        self.actions.append(action)
+        entered = time.perf_counter()
+        self.queue.push((KEY_PRESS, key, entered - self.start_time), entered)
     
     def _on_key_release(self, key):
         if not self.is_recording:
             return
         
-        try:
-            key_name = key.char if hasattr(key, 'char') and key.char else str(key)
-        except AttributeError:
-            key_name = str(key)
-        
-        action = {
-            'type': 'key_release',
-            'key': key_name,
-            'timestamp': self._get_timestamp()
-        }
-        self.actions.append(action)
+        entered = time.perf_counter()
+        self.queue.push((KEY_RELEASE, key, entered - self.start_time), entered)
     
-    def get_current_actions(self) -> List[Dict[str, Any]]:
-        return self.actions.copy()
+    def get_current_actions(self) -> ActionView:
+        return self.actions.view()
     
     def clear_actions(self):
-        self.actions.clear()
+        self.actions = ActionBuffer()
     
     def set_recording_callback(self, callback: Callable[[bool], None]):
         self.on_recording_changed = callback 
\ No newline at end of file
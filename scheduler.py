@@ -0,0 +1,158 @@
+"""
+Absolute-deadline playback scheduling
+"""
+import time
+from array import array
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional
+
+from metrics import metrics
+
+
+LATE_POLICIES = ('catch_up', 'skip')
+
+# Lateness histogram: 0.1 ms buckets up to 1 s, plus one overflow bucket
+BUCKET_WIDTH = 0.0001
+BUCKET_COUNT = 10000
+
+
+class LatenessReport:
+    def __init__(self):
+        self.buckets = array('I', bytes(4 * (BUCKET_COUNT + 1)))
+        self.count = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+        self.expected_duration = 0.0
+        self.actual_duration = 0.0
+    
+    def add(self, lateness: float):
+        lateness = max(0.0, lateness)
+        self.count += 1
+        self.total_lateness += lateness
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+        self.buckets[min(BUCKET_COUNT, int(lateness / BUCKET_WIDTH))] += 1
+    
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket, hits in enumerate(self.buckets):
+            seen += hits
+            if seen >= target:
+                return min(self.max_lateness, (bucket + 1) * BUCKET_WIDTH)
+        return self.max_lateness
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'actions': self.count,
+            'skipped': self.skipped,
+            'coalesced': self.coalesced,
+            'mean_lateness': self.total_lateness / self.count if self.count else 0.0,
+            'p50_lateness': self.percentile(0.50),
+            'p95_lateness': self.percentile(0.95),
+            'p99_lateness': self.percentile(0.99),
+            'max_lateness': self.max_lateness,
+            'expected_duration': self.expected_duration,
+            'actual_duration': self.actual_duration,
+            'drift': self.actual_duration - self.expected_duration
+        }
+
+
+class PlaybackScheduler:
+    def __init__(self, speed: float = 1.0, spin_threshold: float = 0.001,
+                 late_policy: str = 'catch_up', skip_threshold: float = 0.05,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.speed = speed
+        self.spin_threshold = spin_threshold
+        self.late_policy = late_policy if late_policy in LATE_POLICIES else 'catch_up'
+        self.skip_threshold = skip_threshold
+        self.should_stop = should_stop
+        self.origin = 0.0
+        self.loop_origin = 0.0
+        self.first_timestamp = None
+        self.last_deadline = 0.0
+        self.report = LatenessReport()
+    
+    def start(self):
+        self.origin = time.perf_counter()
+        self.loop_origin = self.origin
+        self.first_timestamp = None
+        self.last_deadline = self.origin
+        self.report = LatenessReport()
+    
+    def deadline(self, timestamp: float) -> float:
+        # Deadlines are relative to the schedule origin, so execution cost never accumulates
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        return self.loop_origin + (timestamp - self.first_timestamp) / self.speed
+    
+    def next_loop(self, gap: float = 0.0):
+        # The next pass starts `gap` seconds (wall clock, whatever the speed) after the last
+        # deadline of this one, not after the moment it finished: lateness in one loop never
+        # shifts the following ones, so cadence holds over any number of loops
+        self.loop_origin = self.last_deadline + max(0.0, gap)
+        self.first_timestamp = None
+    
+    def wait_until(self, deadline: float) -> bool:
+        clock = time.perf_counter
+        while True:
+            remaining = deadline - clock()
+            if remaining <= self.spin_threshold:
+                break
+            if self.should_stop and self.should_stop():
+                return False
+            # Sleep in short slices so a stop request is noticed during long gaps
+            time.sleep(min(remaining - self.spin_threshold, 0.05))
+        
+        while clock() < deadline:
+            pass
+        return True
+    
+    def wait_for(self, timestamp: float, skippable: bool = False) -> Optional[bool]:
+        # True: run the action now, False: stop requested, None: skip the action
+        deadline = self.deadline(timestamp)
+        self.last_deadline = deadline
+        if not self.wait_until(deadline):
+            return False
+        
+        lateness = time.perf_counter() - deadline
+        if metrics.enabled:
+            # How far past the deadline the wait returned: sleep overshoot plus backlog
+            metrics.observe('scheduler.overshoot', max(0.0, lateness))
+        if skippable and self.late_policy == 'skip' and lateness > self.skip_threshold:
+            self.report.skipped += 1
+            return None
+        
+        self.report.add(lateness)
+        return True
+    
+    def coalesce_moves(self, records: Iterable) -> Iterator:
+        # For backends that batch movement: a move whose successor is also a move and already
+        # due is dropped, so a backlog of moves becomes one jump to the latest position. Dropped
+        # records are yielded as None so positions still match the source.
+        clock = time.perf_counter
+        pending = None
+        for record in records:
+            if pending is not None:
+                if record is not None and record[3] and clock() >= self.deadline(record[2]):
+                    self.report.coalesced += 1
+                    yield None
+                else:
+                    yield pending
+                pending = None
+            if record is not None and record[3]:
+                # Sets the loop's first timestamp before any later record's deadline is read
+                self.deadline(record[2])
+                pending = record
+            else:
+                yield record
+        if pending is not None:
+            yield pending
+    
+    def finish(self) -> LatenessReport:
+        self.report.expected_duration = self.last_deadline - self.origin
+        self.report.actual_duration = time.perf_counter() - self.origin
+        return self.report 
\ No newline at end of file
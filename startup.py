@@ -0,0 +1,35 @@
+"""
+Startup timing instrumentation
+"""
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+
+class StartupProfile:
+    # Marks are seconds since this module was first imported, which main.py does before anything else
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+    
+    def mark(self, name: str) -> float:
+        elapsed = time.perf_counter() - self.origin
+        self.marks.append((name, elapsed))
+        return elapsed
+    
+    def get(self, name: str) -> Optional[float]:
+        for mark, elapsed in self.marks:
+            if mark == name:
+                return elapsed
+        return None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        # Each phase is the time since the previous mark
+        phases = []
+        previous = 0.0
+        for name, elapsed in self.marks:
+            phases.append({'phase': name, 'seconds': elapsed - previous, 'at': elapsed})
+            previous = elapsed
+        return {'phases': phases, 'marks': dict(self.marks)}
+
+
+profile = StartupProfile() 
\ No newline at end of file
@@ -4,7 +4,32 @@ Macro sequence storage and management module
 import json
 import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+import binary_format
+import compressed_io
+import journal
+import timeline
+from catalog import MacroCatalog
+from metrics import metrics
+from writer import BackgroundWriter, WriteCallback, atomic_path
+from action_buffer import ActionBuffer, ActionView
+from editor import MacroEditor
+from playback_source import PlaybackSource, SequenceSource, BinaryFileSource, JsonLinesSource
+
+
+MACRO_EXTENSIONS = {
+    'json': '.json',
+    'jsonl': '.jsonl',
+    'binary': binary_format.EXTENSION,
+}
+
+# Every file name the library recognizes, plain or compressed (e.g. .json.gz, .rmb.xz)
+MACRO_SUFFIXES = [
+    extension + suffix
+    for extension in MACRO_EXTENSIONS.values()
+    for suffix in [''] + list(compressed_io.CODECS.values())
+]
 
 
 class MacroStorage:
@@ -12,20 +37,83 @@ class MacroStorage:
         self.default_path = default_path
         self.settings_file = "settings.json"
         self.ensure_directory_exists()
+        self.catalog = MacroCatalog(default_path, MACRO_SUFFIXES, self.describe_macro)
+        self.writer = BackgroundWriter()
+        # None keeps float timestamps in JSON/JSONL; an int stores quantized microsecond deltas
+        self.time_quantum_us: Optional[int] = None
         
     def ensure_directory_exists(self):
         if not os.path.exists(self.default_path):
             os.makedirs(self.default_path)
     
-    def save_sequence(self, sequence: List[Dict[str, Any]], filename: str = None) -> str:
+    def save_sequence(self, sequence: List[Dict[str, Any]], filename: str = None,
+                      file_format: str = None, compression: str = None) -> str:
+        filepath, file_format, compression = self._resolve_target(filename, file_format, compression)
+        return self._write_sequence(sequence, filepath, file_format, compression)
+    
+    def save_sequence_async(self, sequence: List[Dict[str, Any]], filename: str = None,
+                            file_format: str = None, compression: str = None,
+                            callback: Optional[WriteCallback] = None) -> str:
+        # Returns the target path right away; callback(filepath, error) runs on the writer thread.
+        # The sequence must not be mutated afterwards (recordings and views never are).
+        filepath, file_format, compression = self._resolve_target(filename, file_format, compression)
+        self.writer.submit(
+            filepath,
+            lambda: self._write_sequence(sequence, filepath, file_format, compression),
+            callback
+        )
+        return filepath
+    
+    def set_time_quantum(self, quantum_us: Optional[int]):
+        # Timing error per action is at most quantum_us / 2 and does not accumulate
+        self.time_quantum_us = max(1, int(quantum_us)) if quantum_us else None
+    
+    def flush_writes(self, timeout: Optional[float] = None) -> bool:
+        return self.writer.flush(timeout)
+    
+    def _resolve_target(self, filename: Optional[str], file_format: Optional[str],
+                        compression: Optional[str]) -> Tuple[str, str, Optional[str]]:
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"macro_{timestamp}.json"
+            filename = f"macro_{timestamp}"
         
-        if not filename.endswith('.json'):
-            filename += '.json'
+        # A codec suffix in the name (macro.json.gz) selects compression too
+        filename, named_codec = compressed_io.split_codec(filename)
+        compression = named_codec or compression
+        if compression and compression not in compressed_io.CODECS:
+            raise Exception(f"Unsupported compression: {compression}")
         
-        filepath = os.path.join(self.default_path, filename)
+        if not file_format:
+            file_format = self._format_from_extension(filename)
+        
+        extension = MACRO_EXTENSIONS[file_format]
+        if not filename.endswith(extension):
+            filename += extension
+        if compression:
+            filename += compressed_io.CODECS[compression]
+        
+        return os.path.join(self.default_path, filename), file_format, compression
+    
+    def _write_sequence(self, sequence: List[Dict[str, Any]], filepath: str,
+                        file_format: str, compression: Optional[str]) -> str:
+        with metrics.timer('storage.save'):
+            try:
+                # Written to a temporary file and renamed, so a crash mid-save keeps the old file
+                with atomic_path(filepath) as temp_path:
+                    if file_format == 'binary':
+                        self._save_binary(sequence, temp_path, compression)
+                    elif file_format == 'jsonl':
+                        self._save_json_lines(sequence, temp_path, compression)
+                    else:
+                        self._save_json(sequence, temp_path, compression)
+                return filepath
+            except Exception as e:
+                raise Exception(f"Error saving file: {str(e)}")
+    
+    def _save_json(self, sequence: List[Dict[str, Any]], filepath: str, compression: str = None):
+        # Recorder hands out lazy views; json needs a real list
+        if not isinstance(sequence, list):
+            sequence = list(sequence)
         
         macro_data = {
             "created_at": datetime.now().isoformat(),
@@ -33,65 +121,222 @@ class MacroStorage:
             "sequence": sequence,
             "total_actions": len(sequence)
         }
+        if self.time_quantum_us:
+            macro_data.update(timeline.header(self.time_quantum_us))
+            macro_data["version"] = "1.1"
+            macro_data["sequence"] = list(timeline.encode_actions(sequence, self.time_quantum_us))
         
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(macro_data, f, indent=2, ensure_ascii=False)
-            return filepath
-        except Exception as e:
-            raise Exception(f"Error saving file: {str(e)}")
+        if compression:
+            # Indentation only costs time once the output is compressed anyway
+            with compressed_io.open_text(filepath, 'w', compression) as f:
+                json.dump(macro_data, f, ensure_ascii=False)
+            return
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(macro_data, f, indent=2, ensure_ascii=False)
+    
+    def _save_json_lines(self, sequence: List[Dict[str, Any]], filepath: str, compression: str = None):
+        # One action per line so playback can stream the file
+        header = {"created_at": datetime.now().isoformat(), "version": "1.0"}
+        # Lets playback start and show progress without counting the lines first
+        if isinstance(sequence, PlaybackSource):
+            count = sequence.known_length()
+        else:
+            count = len(sequence) if hasattr(sequence, '__len__') else None
+        if count is not None:
+            header["total_actions"] = count
+        if self.time_quantum_us:
+            header.update(timeline.header(self.time_quantum_us), version="1.1")
+            sequence = timeline.encode_actions(sequence, self.time_quantum_us)
+        
+        with compressed_io.open_text(filepath, 'w', compression) as f:
+            f.write(json.dumps(header) + '\n')
+            for action in sequence:
+                f.write(json.dumps(action, ensure_ascii=False) + '\n')
+    
+    def _format_from_extension(self, filename: str) -> str:
+        filename, _ = compressed_io.split_codec(filename)
+        for file_format, extension in MACRO_EXTENSIONS.items():
+            if filename.endswith(extension):
+                return file_format
+        return 'json'
+    
+    def _save_binary(self, sequence: List[Dict[str, Any]], filepath: str, compression: str = None):
+        if isinstance(sequence, ActionView):
+            buffer, count = sequence.buffer, len(sequence)
+        else:
+            buffer = ActionBuffer.from_actions(sequence)
+            count = len(buffer)
+        
+        with compressed_io.open_compressed(filepath, 'wb', compression) as f:
+            binary_format.write_buffer(f, buffer, count, self.time_quantum_us or 1)
+    
+    def _is_binary(self, filepath: str) -> bool:
+        with compressed_io.open_compressed(filepath) as f:
+            return f.read(len(binary_format.MAGIC)) == binary_format.MAGIC
+    
+    def _is_json_lines(self, filepath: str) -> bool:
+        return compressed_io.split_codec(filepath)[0].endswith(MACRO_EXTENSIONS['jsonl'])
     
     def load_sequence(self, filepath: str) -> List[Dict[str, Any]]:
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                macro_data = json.load(f)
-            
-            if isinstance(macro_data, list):
-                # Legacy format compatibility
-                return macro_data
-            else:
-                return macro_data.get('sequence', [])
+        with metrics.timer('storage.load'):
+            try:
+                if self._is_binary(filepath):
+                    # Columns are decoded straight off the (de)compressing stream
+                    with compressed_io.open_compressed(filepath) as f:
+                        return binary_format.read_buffer(f).view()
+                
+                if self._is_json_lines(filepath):
+                    return list(JsonLinesSource(filepath))
                 
+                with compressed_io.open_text(filepath) as f:
+                    macro_data = json.load(f)
+                
+                if isinstance(macro_data, list):
+                    # Legacy format compatibility
+                    return macro_data
+                elif timeline.is_delta_encoded(macro_data):
+                    return list(timeline.decode_actions(macro_data.get('sequence', [])))
+                else:
+                    return macro_data.get('sequence', [])
+                    
+            except FileNotFoundError:
+                raise Exception(f"File not found: {filepath}")
+            except json.JSONDecodeError:
+                raise Exception(f"Invalid JSON file: {filepath}")
+            except Exception as e:
+                raise Exception(f"Error loading file: {str(e)}")
+    
+    def open_source(self, filepath: str) -> PlaybackSource:
+        # Streaming formats are read lazily during playback; JSON documents are parsed up front
+        try:
+            if self._is_binary(filepath):
+                # Compressed binaries cannot be memory-mapped; their columns stay compact in memory instead
+                if compressed_io.detect_codec(filepath):
+                    return SequenceSource(self.load_sequence(filepath))
+                return BinaryFileSource(filepath)
+            if self._is_json_lines(filepath):
+                return JsonLinesSource(filepath)
         except FileNotFoundError:
             raise Exception(f"File not found: {filepath}")
-        except json.JSONDecodeError:
-            raise Exception(f"Invalid JSON file: {filepath}")
         except Exception as e:
             raise Exception(f"Error loading file: {str(e)}")
-    
-    def get_available_macros(self) -> List[Dict[str, str]]:
-        macros = []
         
+        return SequenceSource(self.load_sequence(filepath))
+    
+    def open_editor(self, filepath: str) -> MacroEditor:
+        # Binary macros load straight into columns, so the editor starts without any copy
+        return MacroEditor(self.load_sequence(filepath))
+    
+    def join_macros(self, filepaths: List[str], gap: float = 0.0) -> MacroEditor:
+        editor = MacroEditor()
+        for filepath in filepaths:
+            editor.concatenate(self.load_sequence(filepath), gap)
+        return editor
+    
+    def save_edit(self, editor: MacroEditor, filename: str = None,
+                  file_format: str = None, compression: str = None) -> str:
+        # The edit is materialized once into a single buffer, then saved like a recording
+        return self.save_sequence(editor.to_view(), filename, file_format, compression)
+    
+    def convert_macro(self, filepath: str, file_format: str, compression: str = None) -> str:
+        sequence = self.load_sequence(filepath)
+        base, _ = os.path.splitext(compressed_io.split_codec(os.path.abspath(filepath))[0])
+        return self.save_sequence(sequence, base, file_format, compression)
+    
+    def get_available_macros(self) -> List[Dict[str, Any]]:
         if not os.path.exists(self.default_path):
-            return macros
-        
-        for filename in os.listdir(self.default_path):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.default_path, filename)
-                try:
-                    stat = os.stat(filepath)
-                    macros.append({
-                        'name': filename[:-5],  # Remove .json extension
-                        'filename': filename,
-                        'filepath': filepath,
-                        'size': stat.st_size,
-                        'modified': datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-                    })
-                except:
-                    continue
-        
-        return sorted(macros, key=lambda x: x['modified'], reverse=True)
+            return []
+        
+        # Metadata comes from the catalog; only new or modified files are parsed
+        try:
+            self.catalog.refresh()
+            return self.catalog.entries()
+        except Exception as e:
+            metrics.error('storage.catalog', e)
+            return []
+    
+    def describe_macro(self, filepath: str, max_points: int = 512) -> Dict[str, Any]:
+        source = self.open_source(filepath)
+        stride = max(1, len(source) // max_points)
+        histogram: Dict[str, int] = {}
+        points = []
+        duration = 0
+        total = 0
+        
+        for i, action in enumerate(source):
+            action_type = action.get('type', '')
+            histogram[action_type] = histogram.get(action_type, 0) + 1
+            duration = action.get('timestamp', duration)
+            total += 1
+            if i % stride == 0 and 'x' in action:
+                points.append((action['x'], action['y']))
+        
+        return {
+            'total_actions': total,
+            'duration': duration,
+            'histogram': histogram,
+            'points': points
+        }
+    
+    def analyze_macro(self, filepath: str, **options) -> Dict[str, Any]:
+        # Cached in the catalog per file and per option set; see analytics.analyze for the options.
+        # Imported here so numpy, when installed, is not loaded at startup
+        import analytics
+        
+        filepath = os.path.abspath(filepath)
+        key = json.dumps([analytics.REPORT_VERSION, options], sort_keys=True)
+        with metrics.timer('storage.analyze'):
+            return self.catalog.cached_analysis(
+                filepath, key, lambda: analytics.analyze(self.load_sequence(filepath), **options)
+            )
     
     def save_last_sequence(self, sequence: List[Dict[str, Any]]):
         settings = self.load_settings()
         last_file = settings.get('last_sequence_file', 'last_sequence.json')
         self.save_sequence(sequence, last_file)
+        self._retire_journal()
+    
+    def save_last_sequence_async(self, sequence: List[Dict[str, Any]], callback: Optional[WriteCallback] = None):
+        settings = self.load_settings()
+        last_file = settings.get('last_sequence_file', 'last_sequence.json')
+        
+        def finished(filepath, error):
+            if error is None:
+                self._retire_journal()
+            if callback:
+                callback(filepath, error)
+        self.save_sequence_async(sequence, last_file, callback=finished)
+    
+    def _retire_journal(self):
+        # The saved file now supersedes the journaled capture
+        try:
+            journal.retire(self.get_journal_path())
+        except OSError as e:
+            metrics.error('storage.journal_retire', e)
+    
+    def get_journal_path(self) -> str:
+        settings = self.load_settings()
+        last_file = settings.get('last_sequence_file', 'last_sequence.json')
+        return os.path.join(self.default_path, os.path.splitext(last_file)[0] + '.journal')
     
     def load_last_sequence(self) -> Optional[List[Dict[str, Any]]]:
         settings = self.load_settings()
         last_file = settings.get('last_sequence_file', 'last_sequence.json')
         filepath = os.path.join(self.default_path, last_file)
         
+        # A journal is removed once its recording is saved, so one that is still here holds a
+        # recording that never was (journaled stop, or a crash mid-capture); torn trailing
+        # lines are skipped
+        journal_path = self.get_journal_path()
+        try:
+            if os.path.exists(journal_path):
+                recovered = list(JsonLinesSource(journal_path))
+                if recovered:
+                    return recovered
+        except Exception as e:
+            metrics.error('storage.journal_recovery', e)
+        
         try:
             return self.load_sequence(filepath)
         except:
@@ -99,10 +344,19 @@ class MacroStorage:
     
     def save_settings(self, settings: Dict[str, Any]):
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=2, ensure_ascii=False)
+            self._write_settings(settings)
         except Exception as e:
-            pass
+            metrics.error('storage.settings', e)
+    
+    def save_settings_async(self, settings: Dict[str, Any]):
+        # Snapshot now: the caller keeps mutating its settings dict
+        snapshot = dict(settings)
+        self.writer.submit(self.settings_file, lambda: self._write_settings(snapshot))
+    
+    def _write_settings(self, settings: Dict[str, Any]):
+        with atomic_path(self.settings_file) as temp_path:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(settings, f, indent=2, ensure_ascii=False)
     
     def load_settings(self) -> Dict[str, Any]:
         default_settings = {
@@ -110,7 +364,23 @@ class MacroStorage:
             "loop_count": 1,
             "auto_save": True,
             "hotkey_play": "F8",
-            "last_sequence_file": "last_sequence.json"
+            "last_sequence_file": "last_sequence.json",
+            "late_policy": "catch_up",
+            "input_backend": "pyautogui",
+            "journal_recordings": True,
+            "optimize_recordings": False,
+            "optimize_on_load": False,
+            "dedupe_moves": True,
+            "path_tolerance": 1.0,
+            "move_bucket": 0.0,
+            "progress_rate": 30.0,
+            "compression": None,
+            "timestamp_quantum_us": None,
+            "idle_threshold": 1.0,
+            "idle_scale": 1.0,
+            "max_gap": None,
+            "loop_gap": None,
+            "metrics_enabled": False
         }
         
         try:
@@ -121,12 +391,14 @@ class MacroStorage:
                 default_settings.update(settings)
             return default_settings
         except Exception as e:
+            metrics.error('storage.settings', e)
             return default_settings
     
     def delete_macro(self, filepath: str) -> bool:
         try:
             if os.path.exists(filepath):
                 os.remove(filepath)
+                self.catalog.invalidate(filepath)
                 return True
             return False
         except Exception as e:
@@ -0,0 +1,136 @@
+"""
+Compact timestamp encoding: integer microsecond deltas on a quantized timeline
+"""
+from array import array
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+# Stored in the file header of delta-encoded JSON/JSONL macros
+TIME_ENCODING = 'delta_us'
+
+
+def quantize_us(timestamp: float, quantum_us: int = 1) -> int:
+    # Absolute times are rounded (never the deltas), so the error per action stays within
+    # quantum_us / 2 and does not accumulate along the macro
+    return int(round(timestamp * 1000000 / quantum_us)) * quantum_us
+
+
+def error_bound(quantum_us: int) -> float:
+    # Worst-case timing error in seconds introduced by a quantum, for any action
+    return quantum_us / 2 / 1000000
+
+
+def header(quantum_us: int) -> Dict[str, Any]:
+    return {'time_encoding': TIME_ENCODING, 'quantum_us': quantum_us}
+
+
+def is_delta_encoded(header_data: Dict[str, Any]) -> bool:
+    return header_data.get('time_encoding') == TIME_ENCODING
+
+
+def encode_actions(actions: Iterable[Dict[str, Any]], quantum_us: int = 1) -> Iterator[Dict[str, Any]]:
+    # Replaces each float 'timestamp' with 'dt', the integer microseconds since the previous action
+    previous = 0
+    for action in actions:
+        current = quantize_us(action.get('timestamp', 0), quantum_us)
+        encoded = {key: value for key, value in action.items() if key != 'timestamp'}
+        encoded['dt'] = current - previous
+        previous = current
+        yield encoded
+
+
+def decode_action(action: Dict[str, Any], elapsed_us: int) -> int:
+    # In place: turns 'dt' back into an absolute 'timestamp'; returns the new elapsed time
+    elapsed_us += action.pop('dt', 0)
+    action['timestamp'] = elapsed_us / 1000000
+    return elapsed_us
+
+
+def decode_actions(actions: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    elapsed_us = 0
+    for action in actions:
+        elapsed_us = decode_action(action, elapsed_us)
+        yield action
+
+
+class GapPolicy:
+    # Idle gaps (longer than `threshold` seconds between two actions) are shortened on the
+    # recorded timeline, independently of playback_speed: the part beyond the threshold is
+    # multiplied by `scale`, then the gap is capped at `max_gap`. Shorter gaps are untouched.
+    def __init__(self, threshold: float = 1.0, scale: float = 1.0, max_gap: Optional[float] = None):
+        self.threshold = max(0.0, threshold)
+        self.scale = max(0.0, scale)
+        self.max_gap = max(0.0, max_gap) if max_gap is not None else None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.scale != 1.0 or self.max_gap is not None
+    
+    def adjust_gap(self, gap: float) -> float:
+        if gap > self.threshold:
+            gap = self.threshold + (gap - self.threshold) * self.scale
+        if self.max_gap is not None and gap > self.max_gap:
+            gap = self.max_gap
+        return gap
+    
+    def apply(self, records: Iterable[Optional[tuple]]) -> Iterator[Optional[tuple]]:
+        # Rewrites the offset (third field) of playback records; None placeholders pass through
+        previous = None
+        shifted = 0.0
+        for record in records:
+            if record is None:
+                yield record
+                continue
+            func, args, offset, skippable = record
+            if previous is not None:
+                gap = offset - previous
+                shifted += gap - self.adjust_gap(gap)
+            previous = offset
+            yield (func, args, offset - shifted, skippable)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'idle_threshold': self.threshold, 'idle_scale': self.scale, 'max_gap': self.max_gap}
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def timing_profile(timestamps: Iterable[float], policy: Optional[GapPolicy] = None) -> Dict[str, Any]:
+    # One pass over the timeline: interval distribution, idle time and the duration a loop
+    # takes once `policy` is applied (before playback_speed)
+    policy = policy or GapPolicy()
+    intervals = array('d')
+    previous = None
+    idle_gaps = 0
+    idle_time = 0.0
+    adjusted = 0.0
+    
+    for timestamp in timestamps:
+        if previous is not None:
+            gap = timestamp - previous
+            intervals.append(gap)
+            adjusted += policy.adjust_gap(gap)
+            if gap > policy.threshold:
+                idle_gaps += 1
+                idle_time += gap - policy.threshold
+        previous = timestamp
+    
+    # Same as PlaybackSource.duration: the last action's timestamp
+    duration = previous if previous is not None else 0.0
+    ordered = sorted(intervals)
+    return {
+        'actions': len(intervals) + (1 if previous is not None else 0),
+        'duration': duration,
+        'adjusted_duration': adjusted,
+        'idle_threshold': policy.threshold,
+        'idle_gaps': idle_gaps,
+        'idle_time': idle_time,
+        'active_time': duration - idle_time,
+        'longest_gap': ordered[-1] if ordered else 0.0,
+        'p50_interval': _percentile(ordered, 0.50),
+        'p95_interval': _percentile(ordered, 0.95),
+        'p99_interval': _percentile(ordered, 0.99),
+        'events_per_sec': (len(intervals) + 1) / duration if duration else 0.0
+    } 
\ No newline at end of file
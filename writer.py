@@ -0,0 +1,122 @@
+"""
+Atomic file replacement and a background writer thread
+"""
+import os
+import stat
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from metrics import metrics
+
+
+@contextmanager
+def atomic_path(filepath: str) -> Iterator[str]:
+    # Yields a temporary path next to `filepath`; it replaces `filepath` only once fully
+    # written and synced, so an interrupted save leaves the previous file intact
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(filepath) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        yield temp_path
+        with open(temp_path, 'ab') as f:
+            os.fsync(f.fileno())
+        # mkstemp creates owner-only files; keep the permissions the target had
+        try:
+            mode = stat.S_IMODE(os.stat(filepath).st_mode)
+        except OSError:
+            mode = 0o644
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+# callback(result, error): exactly one of them is set
+WriteCallback = Callable[[Any, Optional[Exception]], None]
+
+
+class BackgroundWriter:
+    # One worker thread drains a queue of writes keyed by target. A write submitted while an
+    # earlier one for the same target is still queued replaces it, and both callbacks get the
+    # outcome of the write that actually ran.
+    def __init__(self):
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._busy = False
+        self._closed = False
+        self.written = 0
+        self.coalesced = 0
+        self.failed = 0
+    
+    def submit(self, key: str, write: Callable[[], Any], callback: Optional[WriteCallback] = None):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Writer is closed")
+            callbacks = []
+            if key in self._pending:
+                callbacks = self._pending.pop(key)[1]
+                self.coalesced += 1
+            if callback:
+                callbacks.append(callback)
+            self._pending[key] = (write, callbacks)
+            
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                _key, (write, callbacks) = self._pending.popitem(last=False)
+                self._busy = True
+            
+            result, error = None, None
+            try:
+                result = write()
+                self.written += 1
+            except Exception as e:
+                error = e
+                self.failed += 1
+                metrics.error('writer.write', e)
+            
+            for callback in callbacks:
+                try:
+                    callback(result, error)
+                except Exception as e:
+                    metrics.error('writer.callback', e)
+            
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+    
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending) + (1 if self._busy else 0)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        # Blocks until everything submitted so far is on disk; False on timeout
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+    
+    def close(self, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive() 
\ No newline at end of file